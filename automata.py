@@ -0,0 +1,1925 @@
+"""Autómata finito determinista que reconoce las palabras del juego.
+
+No depende de pygame, de modo que puede importarse desde herramientas sin pantalla.
+"""
+
+import bisect
+
+import heapq
+
+import mmap
+
+import os
+
+import struct
+
+import sys
+
+import zlib
+
+from array import array
+
+from collections import OrderedDict, deque
+
+from collections.abc import Sequence
+
+from contextlib import nullcontext
+
+from operator import itemgetter
+
+
+
+# Valor centinela de la tabla de transiciones: no existe transición
+SIN_TRANSICION = -1
+
+# Formato binario de guardar()/cargar(): cabecera fija seguida de las secciones
+MAGIA_FORMATO = b"AFDB"
+
+VERSION_FORMATO = 2  # La 2 agrega la marca MARCA_MINIMO; se siguen leyendo archivos de la 1
+
+# Marcas del byte de la cabecera que en la versión 1 solo indicaba si el AFD es un árbol
+MARCA_ARBOL = 1
+
+MARCA_MINIMO = 2
+
+CABECERA_FORMATO = struct.Struct("<4sHBBiiiiiIII")
+
+# Validación masiva: bytes de entrada por bloque enviado a un proceso
+TAMANO_BLOQUE_VALIDACION = 1 << 22
+
+RESULTADOS_VALIDACION = ("\tRECHAZADA", "\tACEPTADA")
+
+# Lista de palabras para que caigan
+
+PALABRAS_JUEGO = [
+
+    "PYTHON", "JUEGO", "CODIGO", "NAVE", "DISPARO", "PALABRA", "TEXTO", "LETRA",
+
+    "PROGRAMA", "FUNCION", "CLASE", "OBJETO", "METODO", "VARIABLE", "BUCLE",
+
+    "CONDICIONAL", "ARRAY", "LISTA", "DICCIONARIO", "CADENA", "NUMERO", "BOOLEAN"
+
+]
+
+
+
+def _numpy():
+    """Módulo numpy, o None si no está instalado. Es opcional: cada uso tiene un camino en
+    Python puro, y se importa recién al necesitarlo para no demorar la importación de este módulo"""
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+class _VocabularioMapeado(Sequence):
+    """Vocabulario de solo lectura sobre un archivo mapeado: posiciones de inicio
+    (int32) y el texto UTF-8 de todas las palabras concatenadas"""
+
+    def __init__(self, posiciones, texto):
+        self.posiciones = posiciones
+        self.texto = texto
+
+    def __len__(self):
+        return len(self.posiciones) - 1
+
+    def __getitem__(self, indice):
+        if isinstance(indice, slice):
+            return [self[i] for i in range(*indice.indices(len(self)))]
+        if indice < 0:
+            indice += len(self)
+        if not 0 <= indice < len(self):
+            raise IndexError("índice de palabra fuera de rango")
+        return bytes(self.texto[self.posiciones[indice]:self.posiciones[indice + 1]]).decode("utf-8")
+
+
+class _Completaciones:
+    """Estructura de completar(): pesos y árbol de segmentos sobre una copia del vocabulario
+    (la base) y, aparte y ordenadas, las palabras agregadas después de construirla. Las
+    palabras de la base que se eliminan quedan con peso -inf"""
+
+    __slots__ = ("base", "pesos", "arbol", "agregadas")
+
+    def __init__(self, base, pesos, arbol):
+        self.base = base
+        self.pesos = pesos
+        self.arbol = arbol
+        self.agregadas = []
+
+
+
+
+def _huella_estado(es_final, hijos):
+    """Huella de 128 bits del lenguaje aceptado desde un estado de un AFD acíclico, a partir
+    de si es final y de las huellas de sus sucesores (pares columna, huella)"""
+    from hashlib import blake2b  # Importarlo al cargar el módulo duplica su tiempo de importación
+    
+    partes = [b"\x01" if es_final else b"\x00"]
+    for columna, huella in hijos:
+        partes.append(columna.to_bytes(4, "little"))
+        partes.append(huella)
+    return blake2b(b"".join(partes), digest_size=16).digest()
+
+
+def _construir_fragmento(argumentos):
+    """Construye el autómata de un grupo de sufijos en un proceso del pool; con minimizar=True
+    lo minimiza y calcula la huella de cada estado. Retorna solo bytes para que el envío
+    entre procesos sea barato"""
+    sufijos, raiz_final, alfabeto, minimizar = argumentos
+    fragmento = AutomataFinitoDeterminista.__new__(AutomataFinitoDeterminista)
+    fragmento.palabras = sufijos
+    fragmento.estado_inicial = 0
+    fragmento._inicializar_cache(0)
+    fragmento.construir_automata(alfabeto)
+    if raiz_final:
+        fragmento.finales[0] |= 1
+    huellas = b""
+    if minimizar:
+        fragmento.minimizar()
+        tabla = fragmento.tabla
+        num_columnas = fragmento.num_columnas
+        por_estado = [None] * fragmento.num_estados
+        for estado in fragmento._orden_posterior():
+            fila = estado * num_columnas
+            por_estado[estado] = _huella_estado(
+                fragmento.es_final(estado),
+                ((columna, por_estado[destino]) for columna, destino in enumerate(tabla[fila:fila + num_columnas])
+                 if destino != SIN_TRANSICION))
+        huellas = b"".join(por_estado)
+    return fragmento.tabla.tobytes(), bytes(fragmento.finales), fragmento.num_estados, huellas
+
+
+# Autómata de cada proceso de validar_en_paralelo(), cargado una vez por proceso
+_automata_validacion = None
+
+
+def _iniciar_validacion(ruta):
+    """Carga en el proceso el autómata guardado; al mapear el archivo, todos los procesos
+    comparten las mismas páginas de solo lectura"""
+    global _automata_validacion
+    _automata_validacion = AutomataFinitoDeterminista.cargar(ruta, verificar=False)
+
+
+def _validar_bloque(argumentos):
+    """Valida las líneas de un bloque de bytes; retorna la salida (palabra y resultado por
+    línea, en UTF-8) y la cantidad de palabras validadas y rechazadas"""
+    bloque, con_resultados = argumentos
+    # Solo "\n" (o "\r\n") separa líneas: str.splitlines() también corta en \x0b, \x0c,
+    # \x85, \u2028... y daría más resultados que líneas de entrada
+    texto = bloque.decode("utf-8", errors="replace").replace("\r\n", "\n")
+    lineas = texto.split("\n")
+    if texto.endswith("\n"):
+        lineas.pop()
+    mascara, _ = _automata_validacion.procesar_lote(lineas)
+    if not isinstance(mascara, list):
+        mascara = mascara.tolist()
+    validadas = sum(mascara)
+    salida = b""
+    if con_resultados and lineas:
+        salida = ("\n".join(map(str.__add__, lineas, map(RESULTADOS_VALIDACION.__getitem__, mascara)))
+                  + "\n").encode("utf-8")
+    return salida, validadas, len(lineas) - validadas
+
+
+def leer_bloques(archivo, tamano_bloque=TAMANO_BLOQUE_VALIDACION):
+    """Lee un archivo binario en bloques de unos tamano_bloque bytes que terminan en fin de línea"""
+    resto = b""
+    while True:
+        datos = archivo.read(tamano_bloque)
+        if not datos:
+            break
+        datos = resto + datos
+        corte = datos.rfind(b"\n") + 1
+        resto = datos[corte:]
+        if corte:
+            yield datos[:corte]
+    if resto:
+        yield resto
+
+
+def validar_en_paralelo(ruta, bloques, procesos=None, con_resultados=True):
+    """Valida bloques de líneas (bytes, p. ej. de leer_bloques()) con el autómata guardado en
+    ruta, repartiéndolos entre `procesos` procesos (por defecto, uno por núcleo). Retorna un
+    iterador que produce por cada bloque, en el orden de entrada, la salida con el resultado
+    de cada línea y las cantidades de palabras validadas y rechazadas.
+
+    El archivo se carga aquí, verificando su suma (ValueError si es inválido), antes de
+    iniciar los procesos, que lo cargan sin volver a verificarla"""
+    automata = AutomataFinitoDeterminista.cargar(ruta)
+    return _validar_bloques(automata, ruta, bloques, procesos or os.cpu_count() or 1, con_resultados)
+
+
+def _validar_bloques(automata, ruta, bloques, procesos, con_resultados):
+    """Generador de validar_en_paralelo(). Solo se envían por adelantado dos bloques por
+    proceso, así que la entrada se lee a medida que se valida y la memoria no depende de
+    su tamaño"""
+    from concurrent.futures import ProcessPoolExecutor
+    
+    global _automata_validacion
+    
+    tareas = ((bloque, con_resultados) for bloque in bloques)
+    if procesos == 1:
+        _automata_validacion = automata
+        yield from map(_validar_bloque, tareas)
+        return
+    
+    with ProcessPoolExecutor(procesos, initializer=_iniciar_validacion, initargs=(ruta,)) as pool:
+        pendientes = deque()
+        for tarea in tareas:
+            pendientes.append(pool.submit(_validar_bloque, tarea))
+            if len(pendientes) >= 2 * procesos:
+                yield pendientes.popleft().result()
+        while pendientes:
+            yield pendientes.popleft().result()
+
+
+class AutomataFinitoDeterminista:
+    def __init__(self, palabras, tamano_cache=0):
+        """Inicializa el AFD con una lista de palabras válidas y, opcionalmente,
+        el tamaño de la caché de resultados (0 la desactiva)"""
+        self.palabras = [palabra.upper() for palabra in palabras]
+        self.estado_inicial = 0
+        self._inicializar_cache(tamano_cache)
+        self._pesos_asignados = {}
+        self.construir_automata()
+    
+    def _inicializar_cache(self, tamano_cache):
+        """Prepara la caché LRU de procesar_cadena, que se vacía cuando cambia el autómata"""
+        self.tamano_cache = tamano_cache
+        self._cache = OrderedDict()
+        self.aciertos_cache = 0
+        self.fallos_cache = 0
+        self.desalojos_cache = 0
+    
+    def construir_automata(self, alfabeto=None):
+        """Construye el AFD usando un trie (árbol de prefijos) sobre una tabla compacta.
+        Si se indica, se usa `alfabeto` (ordenado y con todos los caracteres de las palabras)"""
+        # El alfabeto se calcula antes de crear estados para que cada estado
+        # ocupe una fila de ancho fijo en la tabla de transiciones
+        if alfabeto is None:
+            alfabeto = "".join(sorted({caracter for palabra in self.palabras for caracter in palabra}))
+        self.alfabeto = alfabeto
+        self.columnas = {caracter: i for i, caracter in enumerate(self.alfabeto)}
+        self.num_columnas = len(self.alfabeto)
+        
+        # Tabla plana de estados x columnas; la fila del estado e empieza en e * num_columnas
+        fila_vacia = array("i", [SIN_TRANSICION]) * self.num_columnas
+        tabla = array("i", fila_vacia)  # Estado inicial
+        columnas = self.columnas
+        num_columnas = self.num_columnas
+        num_estados = 1
+        num_transiciones = 0
+        estados_finales = []
+        
+        for palabra in self.palabras:
+            if not palabra:
+                continue
+            estado_actual = 0
+            
+            for caracter in palabra:
+                celda = estado_actual * num_columnas + columnas[caracter]
+                nuevo_estado = tabla[celda]
+                if nuevo_estado == SIN_TRANSICION:
+                    # Crear nuevo estado con su fila vacía y la transición hacia él
+                    nuevo_estado = num_estados
+                    num_estados += 1
+                    tabla.extend(fila_vacia)
+                    tabla[celda] = nuevo_estado
+                    num_transiciones += 1
+                estado_actual = nuevo_estado
+            
+            # Al final de la palabra el estado alcanzado es final
+            estados_finales.append(estado_actual)
+        
+        self.tabla = tabla
+        self.num_estados = num_estados
+        self.num_transiciones = num_transiciones
+        
+        # Conjunto de estados finales como mapa de bits (un bit por estado)
+        self.finales = bytearray((num_estados + 7) // 8)
+        for estado in estados_finales:
+            self.finales[estado >> 3] |= 1 << (estado & 7)
+        
+        # Vocabulario en el orden de las columnas; el índice de cada palabra es su posición
+        self.vocabulario = sorted({palabra for palabra in self.palabras if palabra})
+        self.es_arbol = True
+        self.es_minimo = False
+        self._mejores = None
+        self._invalidar_derivados()
+    
+    @classmethod
+    def construir_en_paralelo(cls, palabras, procesos=None, longitud_prefijo=1, minimizar=True, tamano_cache=0):
+        """Construye el AFD repartiendo las palabras según sus primeros `longitud_prefijo`
+        caracteres entre `procesos` procesos (por defecto, uno por núcleo). Cada proceso
+        construye el autómata de los sufijos de un prefijo y aquí se cuelgan todos del
+        trie de prefijos, renumerando sus estados.
+
+        Con minimizar=True cada proceso minimiza su fragmento y calcula la huella del lenguaje
+        de cada estado; al unirlos se fusionan los estados con la misma huella, de modo que el
+        resultado es el AFD mínimo sin volver a minimizar en un solo proceso"""
+        from concurrent.futures import ProcessPoolExecutor
+        
+        if longitud_prefijo < 1:
+            raise ValueError(f"longitud_prefijo debe ser al menos 1 (se recibió {longitud_prefijo})")
+        automata = cls.__new__(cls)
+        automata.palabras = [palabra.upper() for palabra in palabras]
+        automata.estado_inicial = 0
+        automata._inicializar_cache(tamano_cache)
+        automata._pesos_asignados = {}
+        alfabeto = "".join(sorted({caracter for palabra in automata.palabras for caracter in palabra}))
+        columnas = {caracter: i for i, caracter in enumerate(alfabeto)}
+        num_columnas = len(alfabeto)
+        
+        # Sufijos de cada prefijo; una palabra más corta que el prefijo es su propio prefijo
+        sufijos = {}
+        for palabra in automata.palabras:
+            if palabra:
+                sufijos.setdefault(palabra[:longitud_prefijo], []).append(palabra[longitud_prefijo:])
+        
+        # Los sufijos no vacíos de cada prefijo son una tarea del pool; se envían primero
+        # los grupos más grandes para equilibrar la carga entre procesos
+        grupos = sorted(((prefijo, [sufijo for sufijo in grupo if sufijo], "" in grupo)
+                         for prefijo, grupo in sufijos.items()), key=lambda grupo: -len(grupo[1]))
+        grupos = [grupo for grupo in grupos if grupo[1]]
+        tareas = [(grupo, raiz_final, alfabeto, minimizar) for _, grupo, raiz_final in grupos]
+        paralelo = procesos != 1 and len(tareas) > 1
+        
+        np = _numpy()
+        
+        # El estado 0 es el inicial y su fila se completa al final. Ningún otro estado puede
+        # aceptar su mismo lenguaje (el autómata es acíclico), así que nunca se fusiona
+        fila_vacia = array("i", [SIN_TRANSICION]) * num_columnas
+        tabla = array("i", fila_vacia)
+        num_estados = 1
+        finales = []
+        registro = {}  # Huella -> estado del autómata unido (solo con minimizar=True)
+        estados_prefijos = {}  # Prefijo -> estado del autómata unido
+        huellas_prefijos = {}  # Prefijo -> huella de su estado
+        
+        with ProcessPoolExecutor(procesos) if paralelo else nullcontext() as pool:
+            fragmentos = (pool.map if paralelo else map)(_construir_fragmento, tareas)
+            for (prefijo, _, _), (tabla_fragmento, finales_fragmento, estados_fragmento,
+                                  huellas_fragmento) in zip(grupos, fragmentos):
+                # Estado unido de cada estado del fragmento; con minimizar=True se reutilizan
+                # los que ya existen con la misma huella en lugar de agregarlos
+                mapa = []
+                nuevos = []
+                for estado in range(estados_fragmento):
+                    huella = huellas_fragmento[16 * estado:16 * estado + 16]
+                    unido = registro.get(huella) if minimizar else None
+                    if unido is None:
+                        unido = num_estados
+                        num_estados += 1
+                        nuevos.append(estado)
+                        if minimizar:
+                            registro[huella] = unido
+                        if finales_fragmento[estado >> 3] & (1 << (estado & 7)):
+                            finales.append(unido)
+                    mapa.append(unido)
+                mapa.append(SIN_TRANSICION)  # Así mapa[SIN_TRANSICION] es SIN_TRANSICION
+                
+                # Agregar las filas de los estados nuevos traduciendo sus destinos
+                if np is not None:
+                    destinos = np.frombuffer(tabla_fragmento, dtype=np.int32).reshape(estados_fragmento, num_columnas)
+                    tabla.frombytes(np.array(mapa, dtype=np.int32)[destinos[nuevos]].tobytes())
+                else:
+                    destinos = array("i")
+                    destinos.frombytes(tabla_fragmento)
+                    for estado in nuevos:
+                        fila = estado * num_columnas
+                        tabla.extend(array("i", [mapa[destino] for destino in destinos[fila:fila + num_columnas]]))
+                estados_prefijos[prefijo] = mapa[0]
+                huellas_prefijos[prefijo] = huellas_fragmento[:16]
+        
+        # Estados del trie de prefijos que no son raíz de un fragmento, de los más
+        # profundos a los más cercanos al inicial
+        nodos = {clave[:i] for clave in sufijos for i in range(1, len(clave) + 1)}
+        hijos = {}
+        for nodo in nodos:
+            hijos.setdefault(nodo[:-1], []).append((columnas[nodo[-1]], nodo))
+        for nodo in sorted(nodos - estados_prefijos.keys(), key=len, reverse=True):
+            es_final = nodo in sufijos
+            sucesores = hijos.get(nodo, ())
+            huella = None
+            unido = None
+            if minimizar:
+                huella = _huella_estado(es_final, sorted((columna, huellas_prefijos[hijo]) for columna, hijo in sucesores))
+                unido = registro.get(huella)
+            if unido is None:
+                unido = num_estados
+                num_estados += 1
+                if minimizar:
+                    registro[huella] = unido
+                if es_final:
+                    finales.append(unido)
+                fila = array("i", fila_vacia)
+                for columna, hijo in sucesores:
+                    fila[columna] = estados_prefijos[hijo]
+                tabla.extend(fila)
+            estados_prefijos[nodo] = unido
+            huellas_prefijos[nodo] = huella
+        for columna, hijo in hijos.get("", ()):
+            tabla[columna] = estados_prefijos[hijo]
+        
+        automata.alfabeto = alfabeto
+        automata.columnas = columnas
+        automata.num_columnas = num_columnas
+        automata.tabla = tabla
+        automata.num_estados = num_estados
+        automata.num_transiciones = len(tabla) - tabla.count(SIN_TRANSICION)
+        automata.finales = bytearray((num_estados + 7) // 8)
+        for estado in finales:
+            automata.finales[estado >> 3] |= 1 << (estado & 7)
+        automata.vocabulario = sorted({palabra for palabra in automata.palabras if palabra})
+        automata.es_arbol = not minimizar
+        automata.es_minimo = minimizar
+        automata._mejores = None
+        automata._invalidar_derivados()
+        return automata
+    
+    @classmethod
+    def desde_expresiones(cls, patrones, max_estados=1000):
+        """Crea un AutomataExpresiones, que reconoce las cadenas que coinciden con alguna de las
+        expresiones regulares en lugar de una lista de palabras, construyendo su AFD bajo demanda"""
+        return AutomataExpresiones(patrones, max_estados)
+    
+    def es_final(self, estado):
+        """Indica si un estado pertenece al conjunto de estados finales"""
+        return bool(self.finales[estado >> 3] & (1 << (estado & 7)))
+    
+    def procesar_cadena(self, cadena):
+        """Procesa una cadena y retorna si es aceptada por el autómata"""
+        cadena = cadena.upper().strip()
+        if not self.tamano_cache:
+            return self._recorrer_cadena(cadena)
+        
+        # Caché LRU de resultados por cadena normalizada
+        resultado = self._cache.get(cadena)
+        if resultado is not None:
+            self._cache.move_to_end(cadena)
+            self.aciertos_cache += 1
+            return resultado
+        self.fallos_cache += 1
+        resultado = self._recorrer_cadena(cadena)
+        self._cache[cadena] = resultado
+        if len(self._cache) > self.tamano_cache:
+            self._cache.popitem(last=False)
+            self.desalojos_cache += 1
+        return resultado
+    
+    def _recorrer_cadena(self, cadena):
+        """Recorre la tabla de transiciones con una cadena ya normalizada"""
+        columnas = self.columnas
+        tabla = self.tabla
+        num_columnas = self.num_columnas
+        estado_actual = self.estado_inicial
+        
+        for caracter in cadena:
+            columna = columnas.get(caracter)
+            if columna is None:
+                return False, None  # Carácter fuera del alfabeto
+            estado_actual = tabla[estado_actual * num_columnas + columna]
+            if estado_actual == SIN_TRANSICION:
+                return False, None  # Transición no válida
+        
+        # Verificar si el estado actual es final
+        if self.es_final(estado_actual):
+            return True, cadena
+        else:
+            return False, None
+    
+    def _invalidar_derivados(self):
+        """Descarta las estructuras calculadas a partir de la tabla tras modificarla"""
+        self._cuentas = None
+        self._desplazamientos = None
+        self._registro = None
+        self._invalidar_consultas()
+    
+    def _invalidar_consultas(self):
+        """Descarta las estructuras de consulta que no se mantienen de forma incremental"""
+        self._cache.clear()
+        self._tablas_lote = None
+        self._arbol = None
+        self._aho_corasick = None
+    
+    def _asegurar_indices(self):
+        """Calcula el número de palabras aceptadas desde cada estado y los desplazamientos
+        por celda que convierten el recorrido de una palabra en su índice del vocabulario"""
+        if self._cuentas is not None:
+            return
+        tabla = self.tabla
+        num_columnas = self.num_columnas
+        cuentas = array("i", [0]) * self.num_estados
+        desplazamientos = array("i", [0]) * (self.num_estados * num_columnas)
+        
+        # El índice de una palabra es la cantidad de palabras menores que ella: las que
+        # son prefijos suyos y las que se desvían por un carácter menor en algún estado
+        for estado in self._orden_posterior():
+            fila = estado * num_columnas
+            acumulado = 1 if self.es_final(estado) else 0
+            for columna in range(num_columnas):
+                desplazamientos[fila + columna] = acumulado
+                destino = tabla[fila + columna]
+                if destino != SIN_TRANSICION:
+                    acumulado += cuentas[destino]
+            cuentas[estado] = acumulado
+        
+        self._cuentas = cuentas
+        self._desplazamientos = desplazamientos
+    
+    def indice_palabra(self, cadena):
+        """Retorna la posición de la cadena en el vocabulario, o None si no es aceptada"""
+        estado, indice = self._recorrer_con_indice(cadena.upper().strip())
+        return indice if estado != SIN_TRANSICION and self.es_final(estado) else None
+    
+    def _recorrer_con_indice(self, cadena):
+        """Recorre una cadena normalizada y retorna el estado alcanzado y la cantidad de palabras
+        del vocabulario menores que ella, donde empiezan las que la tienen como prefijo"""
+        self._asegurar_indices()
+        columnas = self.columnas
+        tabla = self.tabla
+        desplazamientos = self._desplazamientos
+        num_columnas = self.num_columnas
+        estado_actual = self.estado_inicial
+        indice = 0
+        
+        for caracter in cadena:
+            columna = columnas.get(caracter)
+            if columna is None:
+                return SIN_TRANSICION, None
+            celda = estado_actual * num_columnas + columna
+            estado_actual = tabla[celda]
+            if estado_actual == SIN_TRANSICION:
+                return SIN_TRANSICION, None
+            indice += desplazamientos[celda]
+        
+        return estado_actual, indice
+    
+    def asignar_pesos(self, pesos):
+        """Asigna a las palabras el peso (p. ej. su frecuencia) con que completar() las ordena;
+        las que no estén en `pesos` valen su puntaje en el juego, len(palabra) * 10"""
+        self._pesos_asignados = {palabra.upper(): peso for palabra, peso in pesos.items()}
+        self._mejores = None
+    
+    def _peso(self, palabra):
+        return self._pesos_asignados.get(palabra, len(palabra) * 10)
+    
+    def _preparar_mejores(self):
+        """Peso de cada palabra del vocabulario y un árbol de segmentos con la palabra de
+        mayor peso de cada tramo (a igual peso, la primera en orden alfabético). Solo depende
+        del vocabulario y de los pesos: sobrevive a minimizar(), y agregar_palabra() y
+        eliminar_palabra() la mantienen sin rehacerla (ver _editar_mejores)"""
+        if self._mejores is not None:
+            return self._mejores
+        base = list(self.vocabulario)
+        pesos = array("d", map(self._peso, base))
+        self._mejores = _Completaciones(base, pesos, self._arbol_mejores(pesos))
+        return self._mejores
+    
+    @staticmethod
+    def _arbol_mejores(pesos):
+        """Árbol de segmentos iterativo (hojas en [n, 2n)) con el índice de mayor peso de cada nodo"""
+        cantidad = len(pesos)
+        np = _numpy()
+        if np is None or cantidad < 2:
+            arbol = array("i", [0]) * cantidad
+            arbol.extend(range(cantidad))  # Las hojas son los índices de las palabras
+            for nodo in range(cantidad - 1, 0, -1):
+                izquierda, derecha = arbol[2 * nodo], arbol[2 * nodo + 1]
+                if pesos[derecha] > pesos[izquierda] or (pesos[derecha] == pesos[izquierda] and derecha < izquierda):
+                    izquierda = derecha
+                arbol[nodo] = izquierda
+            return arbol
+        
+        # Con NumPy, por tandas de nodos cuyos hijos ya están calculados: los nodos [a, b)
+        # tienen sus hijos en [2a, 2b), que queda dentro de [b, 2n) si a >= b / 2
+        valores = np.frombuffer(pesos, dtype=np.float64)
+        arbol = np.zeros(2 * cantidad, dtype=np.int32)
+        arbol[cantidad:] = np.arange(cantidad, dtype=np.int32)
+        fin = cantidad
+        while fin > 1:
+            inicio = (fin + 1) // 2
+            izquierda = arbol[2 * inicio:2 * fin:2]
+            derecha = arbol[2 * inicio + 1:2 * fin:2]
+            peso_izquierda, peso_derecha = valores[izquierda], valores[derecha]
+            elegir_derecha = (peso_derecha > peso_izquierda) | ((peso_derecha == peso_izquierda) & (derecha < izquierda))
+            arbol[inicio:fin] = np.where(elegir_derecha, derecha, izquierda)
+            fin = inicio
+        return array("i", arbol.tobytes())
+    
+    def _editar_mejores(self, palabra, agregada):
+        """Actualiza la estructura de completar() tras agregar o eliminar una palabra: las de
+        la base cambian el peso de su hoja (O(log n)) y las nuevas se guardan aparte. Se rehace
+        solo cuando las agregadas aparte superan una fracción de la base"""
+        mejores = self._mejores
+        if mejores is None:
+            return
+        base, pesos, arbol = mejores.base, mejores.pesos, mejores.arbol
+        hoja = bisect.bisect_left(base, palabra)
+        if hoja < len(base) and base[hoja] == palabra:
+            pesos[hoja] = self._peso(palabra) if agregada else float("-inf")
+            cantidad = len(pesos)
+            nodo = (hoja + cantidad) >> 1
+            while nodo >= 1:
+                izquierda, derecha = arbol[2 * nodo], arbol[2 * nodo + 1]
+                if pesos[derecha] > pesos[izquierda] or (pesos[derecha] == pesos[izquierda] and derecha < izquierda):
+                    izquierda = derecha
+                arbol[nodo] = izquierda
+                nodo >>= 1
+        elif agregada:
+            bisect.insort(mejores.agregadas, palabra)
+            if len(mejores.agregadas) > max(256, len(base) // 16):
+                self._mejores = None
+        else:
+            del mejores.agregadas[bisect.bisect_left(mejores.agregadas, palabra)]
+    
+    def _mejor_del_tramo(self, inicio, fin):
+        """Índice de la palabra de mayor peso entre inicio (inclusive) y fin (exclusive)"""
+        pesos, arbol = self._mejores.pesos, self._mejores.arbol
+        cantidad = len(pesos)
+        mejor = -1
+        inicio += cantidad
+        fin += cantidad
+        while inicio < fin:
+            if inicio & 1:
+                candidata = arbol[inicio]
+                if mejor < 0 or pesos[candidata] > pesos[mejor] or (pesos[candidata] == pesos[mejor] and candidata < mejor):
+                    mejor = candidata
+                inicio += 1
+            if fin & 1:
+                fin -= 1
+                candidata = arbol[fin]
+                if mejor < 0 or pesos[candidata] > pesos[mejor] or (pesos[candidata] == pesos[mejor] and candidata < mejor):
+                    mejor = candidata
+            inicio >>= 1
+            fin >>= 1
+        return mejor
+    
+    @staticmethod
+    def _tramo_prefijo(palabras, prefijo):
+        """Tramo [inicio, fin) de una lista ordenada con las palabras que empiezan con el prefijo"""
+        inicio = bisect.bisect_left(palabras, prefijo)
+        # La menor cadena mayor que todas las del tramo: el prefijo sin sus últimos caracteres
+        # U+10FFFF y con el último que queda incrementado (sin ninguno, el tramo llega al final)
+        cabeza = prefijo.rstrip(chr(sys.maxunicode))
+        if not cabeza:
+            return inicio, len(palabras)
+        siguiente = cabeza[:-1] + chr(ord(cabeza[-1]) + 1)
+        return inicio, bisect.bisect_left(palabras, siguiente, inicio)
+    
+    def completar(self, prefijo, k=5):
+        """Las k palabras de mayor peso que empiezan con el prefijo, de mayor a menor. Las
+        palabras con un mismo prefijo ocupan un tramo contiguo del vocabulario ordenado, así
+        que se extraen los máximos del tramo con el árbol de segmentos y un montículo de
+        subtramos, en O(|prefijo| log n + k log k) consultas sin recorrer las completaciones.
+        Las palabras agregadas después de construir el árbol entran al montículo aparte"""
+        prefijo = prefijo.upper().strip()
+        if k <= 0:
+            return []
+        mejores = self._preparar_mejores()
+        base, pesos = mejores.base, mejores.pesos
+        
+        # Entradas (-peso, palabra, índice en la base, tramo); a igual peso sale primero la
+        # menor alfabéticamente. Las agregadas aparte no tienen tramo que partir
+        monticulo = []
+        inicio, fin = self._tramo_prefijo(base, prefijo)
+        if inicio < fin:
+            mejor = self._mejor_del_tramo(inicio, fin)
+            monticulo.append((-pesos[mejor], base[mejor], mejor, inicio, fin))
+        inicio_agregadas, fin_agregadas = self._tramo_prefijo(mejores.agregadas, prefijo)
+        for palabra in mejores.agregadas[inicio_agregadas:fin_agregadas]:
+            heapq.heappush(monticulo, (-self._peso(palabra), palabra, -1, 0, 0))
+        
+        completaciones = []
+        while monticulo and len(completaciones) < k:
+            peso, palabra, mejor, inicio, fin = heapq.heappop(monticulo)
+            if peso == float("inf"):
+                break  # Solo quedan palabras eliminadas de la base
+            completaciones.append(palabra)
+            # El resto del tramo queda partido en dos subtramos a cada lado de la elegida
+            for inicio_sub, fin_sub in ((inicio, mejor), (mejor + 1, fin)):
+                if inicio_sub < fin_sub:
+                    candidata = self._mejor_del_tramo(inicio_sub, fin_sub)
+                    heapq.heappush(monticulo, (-pesos[candidata], base[candidata], candidata, inicio_sub, fin_sub))
+        return completaciones
+    
+    def _preparar_tablas_lote(self, np):
+        """Construye (una sola vez por versión del autómata) las tablas NumPy del procesamiento por lotes"""
+        if self._tablas_lote is not None:
+            return self._tablas_lote
+        self._asegurar_indices()
+        num_estados = self.num_estados
+        num_columnas = self.num_columnas
+        
+        # Se añade un estado muerto (fila num_estados), una columna para caracteres fuera
+        # del alfabeto (lleva al estado muerto) y una de relleno (deja el estado igual)
+        muerto = num_estados
+        transiciones = np.full((num_estados + 1, num_columnas + 2), muerto, dtype=np.int32)
+        originales = np.frombuffer(self.tabla, dtype=np.int32).reshape(num_estados, num_columnas)
+        transiciones[:num_estados, :num_columnas] = np.where(originales == SIN_TRANSICION, muerto, originales)
+        transiciones[:, num_columnas + 1] = np.arange(num_estados + 1, dtype=np.int32)
+        
+        desplazamientos = np.zeros((num_estados + 1, num_columnas + 2), dtype=np.int64)
+        desplazamientos[:num_estados, :num_columnas] = np.frombuffer(
+            self._desplazamientos, dtype=np.int32).reshape(num_estados, num_columnas)
+        
+        finales = np.zeros(num_estados + 1, dtype=bool)
+        finales[:num_estados] = np.unpackbits(
+            np.frombuffer(bytes(self.finales), dtype=np.uint8), bitorder="little")[:num_estados].astype(bool)
+        
+        # Código de columna para cada punto de código hasta el mayor del alfabeto
+        maximo = max(map(ord, self.alfabeto), default=0)
+        codigos = np.full(maximo + 1, num_columnas, dtype=np.int32)
+        for caracter, columna in self.columnas.items():
+            codigos[ord(caracter)] = columna
+        
+        # Ninguna cadena más larga que la palabra más larga es aceptada
+        if isinstance(self.vocabulario, _VocabularioMapeado):
+            # Bytes UTF-8 de cada palabra: cota superior de su cantidad de caracteres
+            longitud_maxima = int(np.diff(np.frombuffer(self.vocabulario.posiciones, dtype=np.int32)).max(initial=0))
+        else:
+            longitud_maxima = max(map(len, self.vocabulario), default=0)
+        
+        self._tablas_lote = (transiciones, desplazamientos, finales, codigos, longitud_maxima)
+        return self._tablas_lote
+    
+    def procesar_lote(self, cadenas):
+        """Procesa un lote de cadenas avanzando todas a la vez por la tabla de transiciones.
+        Retorna la máscara de aceptación y el índice en el vocabulario de cada cadena (-1 si se rechaza)"""
+        np = _numpy()
+        if np is None:
+            # Sin NumPy se procesa cadena por cadena con el mismo resultado
+            indices = [self.indice_palabra(cadena) for cadena in cadenas]
+            return ([indice is not None for indice in indices],
+                    [-1 if indice is None else indice for indice in indices])
+        
+        transiciones, desplazamientos, finales, codigos, longitud_maxima = self._preparar_tablas_lote(np)
+        num_columnas = self.num_columnas
+        cadenas = list(map(str.strip, map(str.upper, cadenas)))
+        longitudes = np.fromiter(map(len, cadenas), dtype=np.int64, count=len(cadenas))
+        # Recortar las cadenas demasiado largas (se rechazan igual) para que una sola no
+        # agrande la matriz de todo el lote
+        limite = longitud_maxima + 1
+        if len(cadenas) and longitudes.max() > limite:
+            cadenas = [cadena[:limite] for cadena in cadenas]
+            longitudes = np.minimum(longitudes, limite)
+        longitud_maxima = int(longitudes.max()) if len(cadenas) else 0
+        
+        # Codificar todas las cadenas de una vez: puntos de código -> columnas
+        puntos = np.frombuffer("".join(cadenas).encode("utf-32-le"), dtype=np.uint32)
+        columnas = np.full(len(puntos), num_columnas, dtype=np.int32)
+        en_rango = puntos < len(codigos)
+        columnas[en_rango] = codigos[puntos[en_rango]]
+        
+        # Matriz rellenada: fila = cadena, columna = posición del carácter
+        tipo = np.uint8 if num_columnas + 2 <= 256 else np.int32
+        matriz = np.full((len(cadenas), longitud_maxima), num_columnas + 1, dtype=tipo)
+        inicios = np.cumsum(longitudes) - longitudes
+        filas = np.repeat(np.arange(len(cadenas)), longitudes)
+        posiciones = np.arange(len(puntos)) - np.repeat(inicios, longitudes)
+        matriz[filas, posiciones] = columnas
+        
+        estados = np.full(len(cadenas), self.estado_inicial, dtype=np.int32)
+        indices = np.zeros(len(cadenas), dtype=np.int64)
+        for posicion in range(longitud_maxima):
+            columna = matriz[:, posicion]
+            indices += desplazamientos[estados, columna]
+            estados = transiciones[estados, columna]
+        
+        mascara = finales[estados]
+        return mascara, np.where(mascara, indices, -1)
+    
+    def _arbol_prefijos(self):
+        """Retorna un AFD con forma de trie para este vocabulario (el propio si aún no se minimizó)"""
+        if self.es_arbol:
+            return self
+        if self._arbol is None:
+            self._arbol = AutomataFinitoDeterminista(self.vocabulario)
+        return self._arbol
+    
+    def _preparar_aho_corasick(self):
+        """Calcula los enlaces de fallo y de salida de Aho-Corasick sobre el trie"""
+        if self._aho_corasick is not None:
+            return self._aho_corasick
+        arbol = self._arbol_prefijos()
+        tabla = arbol.tabla
+        num_columnas = arbol.num_columnas
+        raiz = arbol.estado_inicial
+        fallo = array("i", [raiz]) * arbol.num_estados
+        salida = array("i", [SIN_TRANSICION]) * arbol.num_estados
+        profundidad = array("i", [0]) * arbol.num_estados
+        
+        # Recorrido en anchura: el enlace de fallo de un estado apunta al sufijo propio
+        # más largo que también es prefijo de alguna palabra
+        cola = [raiz]
+        for estado in cola:
+            fila = estado * num_columnas
+            for columna in range(num_columnas):
+                destino = tabla[fila + columna]
+                if destino == SIN_TRANSICION:
+                    continue
+                profundidad[destino] = profundidad[estado] + 1
+                if estado != raiz:
+                    sufijo = fallo[estado]
+                    while sufijo != raiz and tabla[sufijo * num_columnas + columna] == SIN_TRANSICION:
+                        sufijo = fallo[sufijo]
+                    siguiente = tabla[sufijo * num_columnas + columna]
+                    fallo[destino] = raiz if siguiente == SIN_TRANSICION else siguiente
+                # Enlace de salida: el estado final más cercano en la cadena de fallos
+                salida[destino] = destino if arbol.es_final(destino) else salida[fallo[destino]]
+                cola.append(destino)
+        
+        # Palabra asociada a cada estado final del trie
+        palabras = {}
+        for palabra in arbol.vocabulario:
+            estado = raiz
+            for caracter in palabra:
+                estado = tabla[estado * num_columnas + arbol.columnas[caracter]]
+            palabras[estado] = palabra
+        
+        self._aho_corasick = (arbol, fallo, salida, profundidad, palabras)
+        return self._aho_corasick
+    
+    def buscar_en_flujo(self, fragmentos):
+        """Genera (desplazamiento, palabra) por cada palabra del vocabulario que aparece
+        en un flujo de texto recibido por fragmentos, en una sola pasada. Los
+        desplazamientos cuentan caracteres del flujo original, aunque alguno se expanda
+        al pasarlo a mayúsculas (ß -> SS)"""
+        arbol, fallo, salida, profundidad, palabras = self._preparar_aho_corasick()
+        tabla = arbol.tabla
+        columnas = arbol.columnas
+        num_columnas = arbol.num_columnas
+        raiz = arbol.estado_inicial
+        estado_actual = raiz
+        posicion = 0
+        
+        # Tramos recientes del texto en mayúsculas: (índice donde empieza, desplazamiento
+        # original, desplazamiento de cada carácter si alguno se expandió o None)
+        ventana = max(profundidad, default=0)
+        tramos = deque()
+        indice = 0
+        
+        for fragmento in fragmentos:
+            mayusculas = fragmento.upper()
+            expandidos = None
+            if len(mayusculas) != len(fragmento):
+                expandidos = [i for i, caracter in enumerate(fragmento) for _ in caracter.upper()]
+            tramos.append((indice, posicion, expandidos))
+            # Las coincidencias que empiezan en este fragmento sin expansiones se ubican restando
+            desde = indice if expandidos is None else sys.maxsize
+            desfase = posicion - indice
+            # Ninguna coincidencia futura puede empezar antes de indice - ventana + 1
+            while len(tramos) > 1 and tramos[1][0] <= indice - ventana + 1:
+                tramos.popleft()
+            
+            for caracter in mayusculas:
+                columna = columnas.get(caracter)
+                if columna is None:
+                    estado_actual = raiz  # Ninguna palabra contiene este carácter
+                else:
+                    while True:
+                        siguiente = tabla[estado_actual * num_columnas + columna]
+                        if siguiente != SIN_TRANSICION:
+                            estado_actual = siguiente
+                            break
+                        if estado_actual == raiz:
+                            break
+                        estado_actual = fallo[estado_actual]
+                
+                # Reportar todas las palabras que terminan en esta posición
+                final = salida[estado_actual]
+                while final != SIN_TRANSICION:
+                    inicio = indice - profundidad[final] + 1
+                    if inicio >= desde:
+                        yield inicio + desfase, palabras[final]
+                    else:
+                        # Empieza en un fragmento anterior o después de una expansión
+                        for comienzo, original, expandidos_tramo in reversed(tramos):
+                            if comienzo <= inicio:
+                                break
+                        inicio -= comienzo
+                        yield original + (inicio if expandidos_tramo is None else expandidos_tramo[inicio]), palabras[final]
+                    final = salida[fallo[final]]
+                indice += 1
+            posicion += len(fragmento)
+    
+    def transicion(self, estado, caracter):
+        """Aplica una transición desde un estado; SIN_TRANSICION si no existe"""
+        columna = self.columnas.get(caracter)
+        if estado == SIN_TRANSICION or columna is None:
+            return SIN_TRANSICION
+        return self.tabla[estado * self.num_columnas + columna]
+    
+    def completaciones(self, estado):
+        """Cantidad de palabras aceptadas a partir de un estado"""
+        if estado == SIN_TRANSICION:
+            return 0
+        self._asegurar_indices()
+        return self._cuentas[estado]
+    
+    def guardar(self, ruta):
+        """Guarda el autómata compilado (tabla, finales, índices y vocabulario) en un
+        archivo binario versionado con suma de verificación"""
+        self._asegurar_indices()
+        alfabeto = self.alfabeto.encode("utf-8")
+        palabras = [palabra.encode("utf-8") for palabra in self.vocabulario]
+        posiciones = array("i", [0])
+        for palabra in palabras:
+            posiciones.append(posiciones[-1] + len(palabra))
+        texto_palabras = b"".join(palabras)
+        
+        # Cada sección empieza alineada a 4 bytes para poder verla como int32 sin copiar
+        cuerpo = bytearray()
+        for seccion in (alfabeto, self.tabla, self.finales, self._cuentas,
+                        self._desplazamientos, posiciones, texto_palabras):
+            cuerpo += memoryview(seccion).cast("B")
+            cuerpo += bytes(-len(cuerpo) % 4)
+        
+        cabecera = CABECERA_FORMATO.pack(
+            MAGIA_FORMATO, VERSION_FORMATO, sys.byteorder == "big",
+            (MARCA_ARBOL if self.es_arbol else 0) | (MARCA_MINIMO if self.es_minimo else 0),
+            self.estado_inicial, self.num_estados, self.num_columnas, self.num_transiciones,
+            len(palabras), len(alfabeto), len(texto_palabras), zlib.crc32(cuerpo))
+        with open(ruta, "wb") as archivo:
+            archivo.write(cabecera)
+            archivo.write(cuerpo)
+    
+    @classmethod
+    def cargar(cls, ruta, tamano_cache=0, verificar=True):
+        """Carga un autómata guardado con guardar() mapeando el archivo en memoria; la
+        tabla y el vocabulario son vistas sobre el archivo, sin copiarlos"""
+        with open(ruta, "rb") as archivo:
+            datos = mmap.mmap(archivo.fileno(), 0, access=mmap.ACCESS_READ)
+        vista = memoryview(datos)
+        if len(vista) < CABECERA_FORMATO.size:
+            raise ValueError(f"'{ruta}' no es un autómata guardado: archivo demasiado corto")
+        (magia, version, orden_inverso, marcas, estado_inicial, num_estados, num_columnas,
+         num_transiciones, num_palabras, bytes_alfabeto, bytes_palabras,
+         suma) = CABECERA_FORMATO.unpack_from(vista)
+        if magia != MAGIA_FORMATO:
+            raise ValueError(f"'{ruta}' no es un autómata guardado")
+        if version not in (1, VERSION_FORMATO):
+            raise ValueError(f"Versión de formato {version} no soportada (se esperaba {VERSION_FORMATO})")
+        if orden_inverso != (sys.byteorder == "big"):
+            raise ValueError("El autómata se guardó con otro orden de bytes")
+        if verificar and zlib.crc32(vista[CABECERA_FORMATO.size:]) != suma:
+            raise ValueError(f"Suma de verificación incorrecta en '{ruta}'")
+        
+        posicion = CABECERA_FORMATO.size
+        
+        def seccion(num_bytes, formato="B"):
+            nonlocal posicion
+            inicio = posicion
+            posicion += num_bytes + (-num_bytes % 4)
+            return vista[inicio:inicio + num_bytes].cast(formato)
+        
+        automata = cls.__new__(cls)
+        automata._inicializar_cache(tamano_cache)
+        automata._pesos_asignados = {}
+        automata.alfabeto = bytes(seccion(bytes_alfabeto)).decode("utf-8")
+        automata.columnas = {caracter: i for i, caracter in enumerate(automata.alfabeto)}
+        automata.num_columnas = num_columnas
+        automata.tabla = seccion(4 * num_estados * num_columnas, "i")
+        automata.finales = seccion((num_estados + 7) // 8)
+        cuentas = seccion(4 * num_estados, "i")
+        desplazamientos = seccion(4 * num_estados * num_columnas, "i")
+        posiciones = seccion(4 * (num_palabras + 1), "i")
+        automata.vocabulario = _VocabularioMapeado(posiciones, seccion(bytes_palabras))
+        automata.palabras = automata.vocabulario
+        automata.estado_inicial = estado_inicial
+        automata.es_arbol = bool(marcas & MARCA_ARBOL)
+        automata.es_minimo = bool(marcas & MARCA_MINIMO)
+        automata._mejores = None
+        automata.num_estados = num_estados
+        automata.num_transiciones = num_transiciones
+        automata._invalidar_derivados()
+        automata._cuentas = cuentas
+        automata._desplazamientos = desplazamientos
+        automata._mapa = datos  # Mantener abierto el mapeo mientras existan las vistas
+        return automata
+    
+    def _preparar_edicion(self):
+        """Prepara la edición incremental: AFD mínimo, registro de estados por firma,
+        grados de entrada y lista de estados libres"""
+        if self._registro is not None:
+            return
+        if not self.es_minimo:
+            self.minimizar()
+        else:
+            # Ya es mínimo; si se cargó de un archivo, copiar las vistas de solo lectura
+            if isinstance(self.tabla, memoryview):
+                self.tabla = array("i", self.tabla.tobytes())
+            if isinstance(self.finales, memoryview):
+                self.finales = bytearray(self.finales)
+            if isinstance(self._cuentas, memoryview):
+                self._cuentas = array("i", self._cuentas.tobytes())
+                self._desplazamientos = array("i", self._desplazamientos.tobytes())
+        self.vocabulario = list(self.vocabulario)
+        self.palabras = self.vocabulario
+        
+        tabla = self.tabla
+        num_estados = self.num_estados
+        self._libres = []
+        np = _numpy()
+        
+        # En un AFD mínimo no hay dos estados con la misma firma (la de _firma(): si es final
+        # y la fila de transiciones en bytes)
+        if np is not None:
+            destinos = np.frombuffer(tabla, dtype=np.int32)
+            self._entradas = array("i", np.bincount(destinos[destinos != SIN_TRANSICION],
+                                                    minlength=num_estados).astype(np.int32).tobytes())
+            firmas = np.empty((num_estados, 1 + 4 * self.num_columnas), dtype=np.uint8)
+            firmas[:, 0] = np.unpackbits(np.frombuffer(bytes(self.finales), dtype=np.uint8),
+                                         bitorder="little")[:num_estados]
+            firmas[:, 1:] = destinos.view(np.uint8).reshape(num_estados, 4 * self.num_columnas)
+            self._registro = dict(zip(firmas.view(f"V{firmas.shape[1]}").ravel().tolist(), range(num_estados)))
+            del self._registro[self._firma(self.estado_inicial)]
+        else:
+            entradas = array("i", [0]) * num_estados
+            for destino in tabla:
+                if destino != SIN_TRANSICION:
+                    entradas[destino] += 1
+            self._entradas = entradas
+            self._registro = {self._firma(estado): estado
+                              for estado in range(num_estados) if estado != self.estado_inicial}
+    
+    def _firma(self, estado):
+        """Firma de un estado para el registro: si es final y sus transiciones"""
+        fila = estado * self.num_columnas
+        return bytes((self.es_final(estado),)) + self.tabla[fila:fila + self.num_columnas].tobytes()
+    
+    def _desregistrar(self, estado):
+        """Quita un estado del registro antes de modificarlo"""
+        firma = self._firma(estado)
+        if self._registro.get(firma) == estado:
+            del self._registro[firma]
+    
+    def _marcar_final(self, estado, es_final):
+        """Agrega o quita un estado del conjunto de estados finales"""
+        if es_final:
+            self.finales[estado >> 3] |= 1 << (estado & 7)
+        else:
+            self.finales[estado >> 3] &= ~(1 << (estado & 7)) & 0xFF
+    
+    def _nuevo_estado(self):
+        """Crea un estado sin transiciones, reutilizando uno libre si lo hay"""
+        if self._libres:
+            return self._libres.pop()
+        estado = self.num_estados
+        self.num_estados += 1
+        self.tabla.extend(array("i", [SIN_TRANSICION]) * self.num_columnas)
+        if len(self.finales) * 8 <= estado:
+            self.finales.append(0)
+        self._entradas.append(0)
+        if self._cuentas is not None:
+            self._cuentas.append(0)
+            self._desplazamientos.extend(array("i", [0]) * self.num_columnas)
+        return estado
+    
+    def _enlazar(self, origen, columna, destino):
+        """Cambia el destino de una transición manteniendo los grados de entrada"""
+        celda = origen * self.num_columnas + columna
+        anterior = self.tabla[celda]
+        if anterior != SIN_TRANSICION:
+            self._entradas[anterior] -= 1
+            self.num_transiciones -= 1
+        if destino != SIN_TRANSICION:
+            self._entradas[destino] += 1
+            self.num_transiciones += 1
+        self.tabla[celda] = destino
+    
+    def _clonar_estado(self, estado):
+        """Crea una copia de un estado con sus mismas transiciones"""
+        clon = self._nuevo_estado()
+        fila = estado * self.num_columnas
+        for columna in range(self.num_columnas):
+            destino = self.tabla[fila + columna]
+            if destino != SIN_TRANSICION:
+                self._enlazar(clon, columna, destino)
+        self._marcar_final(clon, self.es_final(estado))
+        return clon
+    
+    def _liberar_estado(self, estado):
+        """Elimina un estado ya inalcanzable y lo deja disponible para reutilizarlo"""
+        for columna in range(self.num_columnas):
+            self._enlazar(estado, columna, SIN_TRANSICION)
+        self._marcar_final(estado, False)
+        self._libres.append(estado)
+    
+    def _separar_camino(self, palabra):
+        """Recorre el prefijo existente de la palabra dejando sus estados fuera del registro;
+        a partir del primer estado con varias entradas se clonan para no afectar otras palabras"""
+        camino = [self.estado_inicial]
+        clonando = False
+        for caracter in palabra:
+            columna = self.columnas[caracter]
+            anterior = camino[-1]
+            siguiente = self.tabla[anterior * self.num_columnas + columna]
+            if siguiente == SIN_TRANSICION:
+                break
+            if clonando or self._entradas[siguiente] > 1:
+                clonando = True
+                siguiente = self._clonar_estado(siguiente)
+                self._enlazar(anterior, columna, siguiente)
+            else:
+                self._desregistrar(siguiente)
+            camino.append(siguiente)
+        return camino
+    
+    def _registrar_camino(self, palabra, camino):
+        """Desde el final del camino, reemplaza cada estado por uno equivalente del
+        registro o lo registra, y actualiza los índices de los estados del camino"""
+        for i in range(len(camino) - 1, 0, -1):
+            estado = camino[i]
+            firma = self._firma(estado)
+            equivalente = self._registro.setdefault(firma, estado)
+            if equivalente != estado:
+                self._enlazar(camino[i - 1], self.columnas[palabra[i - 1]], equivalente)
+                self._liberar_estado(estado)
+                camino[i] = equivalente
+        
+        if self._cuentas is not None:
+            for estado in reversed(camino):
+                self._recalcular_indices_estado(estado)
+        self.es_arbol = False
+        self._invalidar_consultas()
+    
+    def _recalcular_indices_estado(self, estado):
+        """Recalcula la cuenta y los desplazamientos de un estado a partir de sus sucesores"""
+        fila = estado * self.num_columnas
+        acumulado = 1 if self.es_final(estado) else 0
+        for columna in range(self.num_columnas):
+            self._desplazamientos[fila + columna] = acumulado
+            destino = self.tabla[fila + columna]
+            if destino != SIN_TRANSICION:
+                acumulado += self._cuentas[destino]
+        self._cuentas[estado] = acumulado
+    
+    def _ampliar_alfabeto(self, caracteres):
+        """Agrega caracteres nuevos al alfabeto, rehaciendo la tabla con más columnas"""
+        alfabeto = "".join(sorted(set(self.alfabeto) | set(caracteres)))
+        columnas = {caracter: i for i, caracter in enumerate(alfabeto)}
+        tabla = array("i", [SIN_TRANSICION]) * (self.num_estados * len(alfabeto))
+        for estado in range(self.num_estados):
+            for caracter, columna in self.columnas.items():
+                tabla[estado * len(alfabeto) + columnas[caracter]] = self.tabla[estado * self.num_columnas + columna]
+        
+        registro = self._registro
+        self.alfabeto = alfabeto
+        self.columnas = columnas
+        self.num_columnas = len(alfabeto)
+        self.tabla = tabla
+        self._invalidar_derivados()
+        if registro is not None:
+            # Ampliar no renumera estados: los grados de entrada y los estados libres
+            # siguen valiendo y solo cambian las firmas, que ahora tienen más columnas
+            self._registro = {self._firma(estado): estado for estado in registro.values()}
+    
+    def agregar_palabra(self, palabra):
+        """Agrega una palabra al AFD mínimo sin reconstruirlo. Retorna False si ya existía"""
+        palabra = palabra.upper().strip()
+        if not palabra or self._recorrer_cadena(palabra)[0]:
+            return False
+        nuevos = set(palabra) - set(self.columnas)
+        if nuevos:
+            self._ampliar_alfabeto(nuevos)
+        self._preparar_edicion()
+        
+        # Reutilizar el prefijo existente y crear los estados del resto de la palabra
+        camino = self._separar_camino(palabra)
+        for caracter in palabra[len(camino) - 1:]:
+            nuevo = self._nuevo_estado()
+            self._enlazar(camino[-1], self.columnas[caracter], nuevo)
+            camino.append(nuevo)
+        self._marcar_final(camino[-1], True)
+        self._registrar_camino(palabra, camino)
+        bisect.insort(self.vocabulario, palabra)
+        self._editar_mejores(palabra, True)
+        return True
+    
+    def eliminar_palabra(self, palabra):
+        """Elimina una palabra del AFD mínimo sin reconstruirlo. Retorna False si no existía"""
+        palabra = palabra.upper().strip()
+        if not palabra or not self._recorrer_cadena(palabra)[0]:
+            return False
+        self._preparar_edicion()
+        
+        camino = self._separar_camino(palabra)
+        self._marcar_final(camino[-1], False)
+        
+        # Podar los estados del final que ya no llevan a ninguna palabra
+        while len(camino) > 1:
+            estado = camino[-1]
+            fila = estado * self.num_columnas
+            if self.es_final(estado) or any(destino != SIN_TRANSICION
+                                           for destino in self.tabla[fila:fila + self.num_columnas]):
+                break
+            self._enlazar(camino[-2], self.columnas[palabra[len(camino) - 2]], SIN_TRANSICION)
+            self._liberar_estado(estado)
+            camino.pop()
+        self._registrar_camino(palabra, camino)
+        del self.vocabulario[bisect.bisect_left(self.vocabulario, palabra)]
+        self._editar_mejores(palabra, False)
+        
+        # Compactar la tabla si acumula demasiados estados libres
+        if len(self._libres) > self.num_estados // 2:
+            self.minimizar()
+        return True
+    
+    def reconocer_aproximado(self, cadena, max_distancia=1, limite=None):
+        """Retorna las palabras a distancia de edición (Levenshtein) de la cadena menor o igual
+        a max_distancia, como pares (palabra, distancia) de la más cercana a la más lejana"""
+        cadena = cadena.upper().strip()
+        tabla = self.tabla
+        alfabeto = self.alfabeto
+        num_columnas = self.num_columnas
+        resultados = []
+        
+        # Cada fila es el estado del autómata de Levenshtein de la cadena: la distancia entre
+        # el prefijo recorrido en el AFD y cada prefijo de la cadena. Las ramas cuya fila
+        # supera max_distancia en todas sus posiciones ya no pueden llegar a una palabra cercana
+        pila = [(self.estado_inicial, "", list(range(len(cadena) + 1)))]
+        while pila:
+            estado, prefijo, fila = pila.pop()
+            if fila[-1] <= max_distancia and self.es_final(estado):
+                resultados.append((prefijo, fila[-1]))
+            
+            inicio_fila = estado * num_columnas
+            for columna in range(num_columnas):
+                destino = tabla[inicio_fila + columna]
+                if destino == SIN_TRANSICION:
+                    continue
+                caracter = alfabeto[columna]
+                nueva_fila = [fila[0] + 1]
+                for i, caracter_cadena in enumerate(cadena, 1):
+                    nueva_fila.append(min(nueva_fila[i - 1] + 1, fila[i] + 1,
+                                          fila[i - 1] + (caracter_cadena != caracter)))
+                if min(nueva_fila) <= max_distancia:
+                    pila.append((destino, prefijo + caracter, nueva_fila))
+        
+        resultados.sort(key=lambda resultado: (resultado[1], resultado[0]))
+        return resultados[:limite] if limite else resultados
+    
+    def es_palabra_valida(self, palabra):
+        """Verifica si una palabra es válida según el autómata"""
+        aceptada, palabra_reconocida = self.procesar_cadena(palabra)
+        return aceptada
+    
+    def obtener_palabra_reconocida(self, palabra):
+        """Obtiene la palabra completa reconocida por el autómata"""
+        aceptada, palabra_reconocida = self.procesar_cadena(palabra)
+        return palabra_reconocida if aceptada else None
+    
+    def _orden_posterior(self):
+        """Estados alcanzables en orden posterior (cada estado aparece después de sus sucesores)"""
+        tabla = self.tabla
+        num_columnas = self.num_columnas
+        # 0 = sin visitar, 1 = en la pila, 2 = terminado
+        marca = bytearray(self.num_estados)
+        orden = []
+        pila = [(self.estado_inicial, 0)]
+        marca[self.estado_inicial] = 1
+        
+        while pila:
+            estado, columna = pila[-1]
+            fila = estado * num_columnas
+            while columna < num_columnas:
+                destino = tabla[fila + columna]
+                columna += 1
+                if destino == SIN_TRANSICION or marca[destino] == 2:
+                    continue
+                if marca[destino] == 1:
+                    raise ValueError("El autómata tiene ciclos; solo se pueden minimizar AFD acíclicos")
+                pila[-1] = (estado, columna)
+                marca[destino] = 1
+                pila.append((destino, 0))
+                break
+            else:
+                pila.pop()
+                marca[estado] = 2
+                orden.append(estado)
+        return orden
+    
+    def minimizar(self):
+        """Minimiza el AFD acíclico (algoritmo de Revuz) y retorna los conteos antes y después"""
+        estadisticas = {
+            "estados_antes": self.num_estados,
+            "transiciones_antes": self.num_transiciones,
+        }
+        tabla = self.tabla
+        num_columnas = self.num_columnas
+        
+        # Recorriendo los estados de abajo hacia arriba, dos estados son equivalentes
+        # si coinciden en ser finales y en los representantes de sus sucesores
+        representante = array("i", [SIN_TRANSICION]) * self.num_estados
+        registro = {}
+        for estado in self._orden_posterior():
+            fila = estado * num_columnas
+            sucesores = tuple(destino if destino == SIN_TRANSICION else representante[destino]
+                              for destino in tabla[fila:fila + num_columnas])
+            es_final = self.es_final(estado)
+            if (not es_final and estado != self.estado_inicial and
+                    all(destino == SIN_TRANSICION for destino in sucesores)):
+                continue  # Estado muerto: no conduce a ninguna palabra
+            representante[estado] = registro.setdefault((es_final, sucesores), estado)
+        
+        # Renumerar los representantes en anchura para que el inicial sea el estado 0
+        nuevo_numero = array("i", [SIN_TRANSICION]) * self.num_estados
+        inicial = representante[self.estado_inicial]
+        nuevo_numero[inicial] = 0
+        cola = [inicial]
+        for estado in cola:
+            fila = estado * num_columnas
+            for destino in tabla[fila:fila + num_columnas]:
+                if destino == SIN_TRANSICION:
+                    continue
+                destino = representante[destino]
+                if destino != SIN_TRANSICION and nuevo_numero[destino] == SIN_TRANSICION:
+                    nuevo_numero[destino] = len(cola)
+                    cola.append(destino)
+        
+        nueva_tabla = array("i", [SIN_TRANSICION]) * (len(cola) * num_columnas)
+        finales = bytearray((len(cola) + 7) // 8)
+        num_transiciones = 0
+        for nuevo, estado in enumerate(cola):
+            fila = estado * num_columnas
+            for columna in range(num_columnas):
+                destino = tabla[fila + columna]
+                if destino != SIN_TRANSICION and representante[destino] != SIN_TRANSICION:
+                    nueva_tabla[nuevo * num_columnas + columna] = nuevo_numero[representante[destino]]
+                    num_transiciones += 1
+            if self.es_final(estado):
+                finales[nuevo >> 3] |= 1 << (nuevo & 7)
+        
+        self.tabla = nueva_tabla
+        self.finales = finales
+        self.estado_inicial = 0
+        self.es_arbol = False
+        self.es_minimo = True
+        self.num_estados = len(cola)
+        self.num_transiciones = num_transiciones
+        self._invalidar_derivados()
+        
+        estadisticas["estados_despues"] = self.num_estados
+        estadisticas["transiciones_despues"] = self.num_transiciones
+        return estadisticas
+    
+    def union(self, otro, minimizar=False):
+        """AFD de las palabras de este autómata o de `otro` (ver _producto)"""
+        return self._producto(otro, "union", minimizar)
+    
+    def interseccion(self, otro, minimizar=False):
+        """AFD de las palabras que están en este autómata y en `otro` (ver _producto)"""
+        return self._producto(otro, "interseccion", minimizar)
+    
+    def diferencia(self, otro, minimizar=False):
+        """AFD de las palabras de este autómata que no están en `otro` (ver _producto)"""
+        return self._producto(otro, "diferencia", minimizar)
+    
+    def _producto(self, otro, operacion, minimizar):
+        """Construye el autómata producto recorriendo en profundidad solo los pares de estados
+        (de este autómata, de `otro`) alcanzables desde el par inicial; SIN_TRANSICION en un
+        lado del par representa que ese autómata ya rechazó el prefijo. Los estados se crean
+        en orden posterior y se descartan los que no conducen a ninguna palabra, así que el
+        resultado no tiene estados muertos. Con minimizar=True además se minimiza"""
+        if not isinstance(otro, AutomataFinitoDeterminista):
+            raise ValueError("Las operaciones de conjuntos requieren otro AutomataFinitoDeterminista")
+        if operacion == "union":
+            alfabeto = "".join(sorted(set(self.alfabeto) | set(otro.alfabeto)))
+        elif operacion == "interseccion":
+            alfabeto = "".join(sorted(set(self.alfabeto) & set(otro.alfabeto)))
+        else:
+            alfabeto = self.alfabeto
+        num_columnas = len(alfabeto)
+        fila_a = self._lector_filas(alfabeto)
+        fila_b = otro._lector_filas(alfabeto)
+        
+        # Transiciones (columna, par destino) de un par que pueden llevar a alguna palabra
+        # y pares finales, según la operación
+        if operacion == "union":
+            def transiciones_par(fila_a, fila_b):
+                return [(columna, (a, b)) for columna, (a, b) in enumerate(zip(fila_a, fila_b))
+                        if a != SIN_TRANSICION or b != SIN_TRANSICION]
+            def es_final(a, b):
+                return (a != SIN_TRANSICION and self.es_final(a)) or (b != SIN_TRANSICION and otro.es_final(b))
+        elif operacion == "interseccion":
+            def transiciones_par(fila_a, fila_b):
+                return [(columna, (a, fila_b[columna])) for columna, a in enumerate(fila_a)
+                        if a != SIN_TRANSICION and fila_b[columna] != SIN_TRANSICION]
+            def es_final(a, b):
+                return self.es_final(a) and otro.es_final(b)
+        else:
+            def transiciones_par(fila_a, fila_b):
+                return [(columna, (a, fila_b[columna])) for columna, a in enumerate(fila_a) if a != SIN_TRANSICION]
+            def es_final(a, b):
+                return self.es_final(a) and not (b != SIN_TRANSICION and otro.es_final(b))
+        
+        fila_vacia = array("i", [SIN_TRANSICION]) * num_columnas
+        tabla = array("i")
+        finales = bytearray()
+        num_estados = 0
+        num_transiciones = 0
+        estado_de_par = {}  # (a, b) -> estado del producto, o SIN_TRANSICION si no acepta nada
+        
+        def visitar(par):
+            """Entrada de la pila para un par: sus transiciones (columna, par destino) que
+            existen, la siguiente por revisar y la fila del producto que se va completando"""
+            return par, transiciones_par(fila_a(par[0]), fila_b(par[1])), 0, array("i", fila_vacia)
+        
+        pila = [visitar((self.estado_inicial, otro.estado_inicial))]
+        while pila:
+            par, sucesores, siguiente, fila = pila[-1]
+            while siguiente < len(sucesores):
+                columna, destino_par = sucesores[siguiente]
+                siguiente += 1
+                destino = estado_de_par.get(destino_par)
+                if destino is None:
+                    # Par nuevo: se visita antes de completar esta fila
+                    pila[-1] = (par, sucesores, siguiente, fila)
+                    pila.append(visitar(destino_par))
+                    break
+                fila[columna] = destino
+            else:
+                pila.pop()
+                final = es_final(*par)
+                salidas = num_columnas - fila.count(SIN_TRANSICION)
+                if final or salidas or not pila:
+                    estado = num_estados
+                    num_estados += 1
+                    tabla.extend(fila)
+                    if estado >> 3 == len(finales):
+                        finales.append(0)
+                    if final:
+                        finales[estado >> 3] |= 1 << (estado & 7)
+                    num_transiciones += salidas
+                else:
+                    estado = SIN_TRANSICION
+                estado_de_par[par] = estado
+                if pila:
+                    _, sucesores_padre, siguiente_padre, fila_padre = pila[-1]
+                    fila_padre[sucesores_padre[siguiente_padre - 1][0]] = estado
+        
+        resultado = AutomataFinitoDeterminista.__new__(AutomataFinitoDeterminista)
+        resultado._inicializar_cache(self.tamano_cache)
+        resultado._pesos_asignados = {**otro._pesos_asignados, **self._pesos_asignados}
+        resultado.alfabeto = alfabeto
+        resultado.columnas = {caracter: i for i, caracter in enumerate(alfabeto)}
+        resultado.num_columnas = num_columnas
+        resultado.tabla = tabla
+        resultado.finales = finales
+        resultado.estado_inicial = num_estados - 1  # El par inicial es el último en terminar
+        resultado.num_estados = num_estados
+        resultado.num_transiciones = num_transiciones
+        # Un par tiene un único camino desde el inicial si lo tiene un lado que nunca es
+        # SIN_TRANSICION: este autómata en la diferencia, cualquiera en la intersección; en
+        # la unión cualquiera de los dos puede faltar, así que ambos deben ser árboles
+        if operacion == "union":
+            resultado.es_arbol = self.es_arbol and otro.es_arbol
+        elif operacion == "interseccion":
+            resultado.es_arbol = self.es_arbol or otro.es_arbol
+        else:
+            resultado.es_arbol = self.es_arbol
+        resultado.es_minimo = False
+        resultado._mejores = None
+        resultado._invalidar_derivados()
+        resultado.vocabulario = self._combinar_vocabularios(self.vocabulario, otro.vocabulario, operacion)
+        resultado.palabras = resultado.vocabulario
+        if minimizar:
+            resultado.minimizar()
+        return resultado
+    
+    def _lector_filas(self, alfabeto):
+        """Función que da la fila de transiciones de un estado (o de SIN_TRANSICION, sin
+        ninguna) con las columnas de `alfabeto`, que puede tener caracteres que este no tiene"""
+        tabla = self.tabla
+        ancho = self.num_columnas
+        vacia = [SIN_TRANSICION] * len(alfabeto)
+        if alfabeto == self.alfabeto:
+            def fila(estado):
+                if estado == SIN_TRANSICION:
+                    return vacia
+                return tabla[estado * ancho:(estado + 1) * ancho].tolist()
+            return fila
+        
+        # La columna `ancho` de la fila extendida es SIN_TRANSICION, para los caracteres ausentes
+        indices = [self.columnas.get(caracter, ancho) for caracter in alfabeto]
+        if len(indices) > 1:
+            obtener = itemgetter(*indices)
+        else:
+            obtener = lambda extendida: [extendida[indice] for indice in indices]  # itemgetter no da tupla
+        def fila(estado):
+            if estado == SIN_TRANSICION:
+                return vacia
+            extendida = tabla[estado * ancho:(estado + 1) * ancho].tolist()
+            extendida.append(SIN_TRANSICION)
+            return obtener(extendida)
+        return fila
+    
+    @staticmethod
+    def _combinar_vocabularios(primero, segundo, operacion):
+        """Une, interseca o resta dos vocabularios ordenados recorriéndolos a la par"""
+        resultado = []
+        otras = iter(segundo)
+        otra = next(otras, None)
+        for palabra in primero:
+            while otra is not None and otra < palabra:
+                if operacion == "union":
+                    resultado.append(otra)
+                otra = next(otras, None)
+            if otra == palabra:
+                if operacion != "diferencia":
+                    resultado.append(palabra)
+                otra = next(otras, None)
+            elif operacion != "interseccion":
+                resultado.append(palabra)
+        if operacion == "union" and otra is not None:
+            resultado.append(otra)
+            resultado.extend(otras)
+        return resultado
+    
+    @property
+    def estados_finales(self):
+        """Conjunto de estados finales (vista derivada del mapa de bits)"""
+        return {estado for estado in range(self.num_estados) if self.es_final(estado)}
+    
+    @property
+    def transiciones(self):
+        """Transiciones como diccionario (origen, carácter) -> destino, para depuración"""
+        transiciones = {}
+        for estado in range(self.num_estados):
+            fila = estado * self.num_columnas
+            for caracter, columna in self.columnas.items():
+                destino = self.tabla[fila + columna]
+                if destino != SIN_TRANSICION:
+                    transiciones[(estado, caracter)] = destino
+        return transiciones
+    
+    @property
+    def estados(self):
+        """Información de cada estado como diccionario, para depuración"""
+        estados = {estado: {"es_final": self.es_final(estado), "palabra": ""}
+                   for estado in range(self.num_estados)}
+        
+        # Recorrido en profundidad para recuperar la palabra de cada estado final
+        pila = [(self.estado_inicial, "")]
+        while pila:
+            estado, prefijo = pila.pop()
+            if estados[estado]["es_final"] and not estados[estado]["palabra"]:
+                estados[estado]["palabra"] = prefijo
+            fila = estado * self.num_columnas
+            for caracter, columna in self.columnas.items():
+                destino = self.tabla[fila + columna]
+                if destino != SIN_TRANSICION:
+                    pila.append((destino, prefijo + caracter))
+        return estados
+    
+    def mostrar_automata(self):
+        """Muestra la estructura del autómata (para depuración)"""
+        print("=== AUTÓMATA FINITO DETERMINISTA ===")
+        print(f"Estado inicial: {self.estado_inicial}")
+        print(f"Estados finales: {self.estados_finales}")
+        print(f"Tabla de transiciones: {self.num_estados} x {self.num_columnas} celdas")
+        print("\nEstados:")
+        for estado, info in self.estados.items():
+            tipo = "FINAL" if info["es_final"] else "INTERMEDIO"
+            palabra = f" (palabra: {info['palabra']})" if info["palabra"] else ""
+            print(f"  Estado {estado}: {tipo}{palabra}")
+        
+        print("\nTransiciones:")
+        for (origen, caracter), destino in self.transiciones.items():
+            print(f"  δ({origen}, '{caracter}') = {destino}")
+        print("=====================================\n")
+
+
+
+# Tipos de estado del AFN de Thompson de AutomataExpresiones
+_CARACTER, _SEPARAR, _ACEPTAR = range(3)
+
+# Clase de caracteres: (negada, caracteres sueltos, rangos (inicio, fin))
+_CUALQUIERA = (True, frozenset(), ())
+
+
+class _AnalizadorExpresion:
+    """Analizador descendente de expresiones regulares: literales, `.`, clases `[A-Z]` y
+    `[^...]`, grupos, alternativas `|`, los cuantificadores `*`, `+`, `?` y escapes con `\\`.
+    Produce un árbol de tuplas: ("clase", clase), ("concatenar", partes), ("alternar", opciones),
+    ("estrella", a), ("mas", a), ("opcional", a) o ("vacio",)"""
+
+    ESPECIALES = set("|*+?()[].\\")
+
+    def __init__(self, patron):
+        self.patron = patron
+        self.posicion = 0
+
+    def error(self, mensaje):
+        return ValueError(f"Expresión regular inválida '{self.patron}' en la posición {self.posicion}: {mensaje}")
+
+    def siguiente(self):
+        return self.patron[self.posicion] if self.posicion < len(self.patron) else None
+
+    def consumir(self):
+        caracter = self.siguiente()
+        if caracter is None:
+            raise self.error("fin inesperado")
+        self.posicion += 1
+        return caracter
+
+    def analizar(self):
+        arbol = self.alternativa()
+        if self.siguiente() is not None:
+            raise self.error(f"'{self.siguiente()}' inesperado")
+        return arbol
+
+    def alternativa(self):
+        opciones = [self.secuencia()]
+        while self.siguiente() == "|":
+            self.posicion += 1
+            opciones.append(self.secuencia())
+        return opciones[0] if len(opciones) == 1 else ("alternar", opciones)
+
+    def secuencia(self):
+        partes = []
+        while self.siguiente() not in (None, "|", ")"):
+            partes.append(self.factor())
+        if not partes:
+            return ("vacio",)
+        return partes[0] if len(partes) == 1 else ("concatenar", partes)
+
+    def factor(self):
+        arbol = self.atomo()
+        while self.siguiente() in ("*", "+", "?"):
+            arbol = ({"*": "estrella", "+": "mas", "?": "opcional"}[self.consumir()], arbol)
+        return arbol
+
+    def atomo(self):
+        caracter = self.consumir()
+        if caracter == "(":
+            arbol = self.alternativa()
+            if self.siguiente() != ")":
+                raise self.error("falta ')'")
+            self.posicion += 1
+            return arbol
+        if caracter == "[":
+            return ("clase", self.clase())
+        if caracter == ".":
+            return ("clase", _CUALQUIERA)
+        if caracter == "\\":
+            return ("clase", (False, frozenset(self.consumir()), ()))
+        if caracter in self.ESPECIALES:
+            raise self.error(f"'{caracter}' inesperado")
+        return ("clase", (False, frozenset(caracter), ()))
+
+    def clase(self):
+        negada = self.siguiente() == "^"
+        if negada:
+            self.posicion += 1
+        caracteres = set()
+        rangos = []
+        primero = True
+        while primero or self.siguiente() != "]":
+            primero = False
+            inicio = self.consumir()
+            if inicio == "\\":
+                inicio = self.consumir()
+            if self.siguiente() == "-" and self.patron[self.posicion + 1:self.posicion + 2] not in ("", "]"):
+                self.posicion += 1
+                fin = self.consumir()
+                if fin == "\\":
+                    fin = self.consumir()
+                if fin < inicio:
+                    raise self.error(f"rango '{inicio}-{fin}' invertido")
+                rangos.append((inicio, fin))
+            else:
+                caracteres.add(inicio)
+        self.posicion += 1
+        return negada, frozenset(caracteres), tuple(rangos)
+
+
+class _EstadoPerezoso:
+    """Estado del AFD construido bajo demanda: el conjunto de estados del AFN que representa
+    y las transiciones ya calculadas por clase de caracteres (estado, SIN_TRANSICION o None
+    si todavía no se calculó)"""
+
+    __slots__ = ("posiciones", "es_final", "siguientes")
+
+    def __init__(self, posiciones, es_final, num_clases):
+        self.posiciones = posiciones
+        self.es_final = es_final
+        self.siguientes = [None] * num_clases
+
+
+class AutomataExpresiones:
+    """Autómata que reconoce las cadenas que coinciden por completo con alguna de varias
+    expresiones regulares. Las expresiones se compilan a un AFN de Thompson y los estados
+    del AFD equivalente se construyen recién al recorrer una cadena, guardándolos en una
+    caché de a lo sumo `max_estados` estados que se vacía entera al llenarse. Así el
+    reconocimiento es lineal en la longitud de la cadena y la memoria queda acotada aunque
+    el AFD completo tuviera una cantidad exponencial de estados.
+
+    Los caracteres que ninguna expresión distingue (p. ej. todas las letras de [A-Z] si
+    ninguna aparece sola) forman una clase de equivalencia, y las transiciones se calculan
+    y guardan por clase en lugar de por carácter"""
+
+    def __init__(self, patrones, max_estados=1000):
+        if isinstance(patrones, str):
+            patrones = [patrones]
+        self.patrones = [patron.upper() for patron in patrones]
+        if not self.patrones:
+            raise ValueError("Se necesita al menos una expresión regular")
+        if max_estados < 2:
+            raise ValueError("La caché necesita lugar para al menos 2 estados")
+        self.max_estados = max_estados
+
+        arbol = ("alternar", [_AnalizadorExpresion(patron).analizar() for patron in self.patrones])
+
+        # AFN en arreglos paralelos: tipo, clase de caracteres, siguiente y alternativa
+        self._tipos = []
+        self._clases = []
+        self._siguientes = []
+        self._alternativas = []
+        aceptar = self._nuevo_estado_afn(_ACEPTAR)
+        self._inicio_afn = self._compilar(arbol, aceptar)
+        self.num_estados_afn = len(self._tipos)
+        self._calcular_clases()
+
+        self._estados = {}  # Conjunto de estados del AFN -> _EstadoPerezoso
+        self.estados_creados = 0
+        self.vaciados_cache = 0
+        self.estado_inicial = self._registrar(self._clausura([self._inicio_afn]))
+
+    def _nuevo_estado_afn(self, tipo, clase=None, siguiente=None, alternativa=None):
+        self._tipos.append(tipo)
+        self._clases.append(clase)
+        self._siguientes.append(siguiente)
+        self._alternativas.append(alternativa)
+        return len(self._tipos) - 1
+
+    def _compilar(self, arbol, siguiente):
+        """Agrega al AFN los estados de un árbol que continúan en `siguiente`; retorna su inicio"""
+        tipo = arbol[0]
+        if tipo == "vacio":
+            return siguiente
+        if tipo == "clase":
+            return self._nuevo_estado_afn(_CARACTER, arbol[1], siguiente)
+        if tipo == "concatenar":
+            for parte in reversed(arbol[1]):
+                siguiente = self._compilar(parte, siguiente)
+            return siguiente
+        if tipo == "alternar":
+            # Una cadena de estados que eligen entre una opción y las que quedan
+            inicio = self._compilar(arbol[1][-1], siguiente)
+            for opcion in reversed(arbol[1][:-1]):
+                inicio = self._nuevo_estado_afn(_SEPARAR, None, self._compilar(opcion, siguiente), inicio)
+            return inicio
+        if tipo == "opcional":
+            return self._nuevo_estado_afn(_SEPARAR, None, self._compilar(arbol[1], siguiente), siguiente)
+        # estrella y mas: un estado que elige entre repetir el cuerpo o seguir
+        bucle = self._nuevo_estado_afn(_SEPARAR, None, None, siguiente)
+        cuerpo = self._compilar(arbol[1], bucle)
+        self._siguientes[bucle] = cuerpo
+        return bucle if tipo == "estrella" else cuerpo
+
+    def _calcular_clases(self):
+        """Parte los puntos de código en tramos donde todas las clases de caracteres del AFN
+        se comportan igual y agrupa en una misma clase de equivalencia los tramos que
+        coinciden con exactamente las mismas clases del AFN"""
+        clases_afn = sorted({clase for clase in self._clases if clase is not None},
+                            key=lambda clase: (clase[0], sorted(clase[1]), clase[2]))
+        limites = {0}
+        for _, caracteres, rangos in clases_afn:
+            for caracter in caracteres:
+                limites.update((ord(caracter), ord(caracter) + 1))
+            for inicio, fin in rangos:
+                limites.update((ord(inicio), ord(fin) + 1))
+        self._limites = sorted(limite for limite in limites if limite <= sys.maxunicode)
+
+        clase_por_firma = {}
+        self._clase_de_tramo = []
+        for limite in self._limites:
+            caracter = chr(limite)  # Representante del tramo
+            firma = tuple((caracter in caracteres or any(inicio <= caracter <= fin for inicio, fin in rangos)) != negada
+                          for negada, caracteres, rangos in clases_afn)
+            self._clase_de_tramo.append(clase_por_firma.setdefault(firma, len(clase_por_firma)))
+        self.num_clases = len(clase_por_firma)
+
+        # Clases que acepta cada estado del AFN que consume un carácter
+        self._acepta = [None if clase is None else
+                        frozenset(self._clase_de_tramo[i] for i, limite in enumerate(self._limites)
+                                  if self._coincide(clase, chr(limite)))
+                        for clase in self._clases]
+
+        # Tabla de bytes.translate para las cadenas latinas (todas, en el juego)
+        self._traduccion = None
+        if self.num_clases <= 256:
+            self._traduccion = bytes(self._clase(chr(codigo)) for codigo in range(256))
+
+    @staticmethod
+    def _coincide(clase, caracter):
+        negada, caracteres, rangos = clase
+        return (caracter in caracteres or any(inicio <= caracter <= fin for inicio, fin in rangos)) != negada
+
+    def _clase(self, caracter):
+        """Clase de equivalencia de un carácter"""
+        return self._clase_de_tramo[bisect.bisect_right(self._limites, ord(caracter)) - 1]
+
+    def _clases_de(self, cadena):
+        """Clases de los caracteres de una cadena, traducida entera si es latina"""
+        if self._traduccion is not None:
+            try:
+                return cadena.encode("latin-1").translate(self._traduccion)
+            except UnicodeEncodeError:
+                pass
+        return [self._clase(caracter) for caracter in cadena]
+
+    def _clausura(self, estados_afn):
+        """Estados del AFN que consumen un carácter o aceptan, alcanzables sin consumir ninguno"""
+        resultado = set()
+        visitados = set()
+        pila = list(estados_afn)
+        while pila:
+            estado = pila.pop()
+            if estado in visitados:
+                continue
+            visitados.add(estado)
+            if self._tipos[estado] == _SEPARAR:
+                pila.append(self._siguientes[estado])
+                pila.append(self._alternativas[estado])
+            else:
+                resultado.add(estado)
+        return frozenset(resultado)
+
+    def _registrar(self, posiciones):
+        """Estado del AFD para un conjunto de estados del AFN, creándolo si no está en caché"""
+        estado = self._estados.get(posiciones)
+        if estado is not None:
+            return estado
+        if len(self._estados) >= self.max_estados:
+            # Caché llena: se descartan todos los estados (y sus transiciones) salvo el inicial
+            for descartado in self._estados.values():
+                descartado.siguientes = [None] * self.num_clases
+            self._estados.clear()
+            self._estados[self.estado_inicial.posiciones] = self.estado_inicial
+            self.vaciados_cache += 1
+            estado = self._estados.get(posiciones)
+            if estado is not None:
+                return estado
+        estado = _EstadoPerezoso(posiciones, any(self._tipos[posicion] == _ACEPTAR for posicion in posiciones),
+                                 self.num_clases)
+        self._estados[posiciones] = estado
+        self.estados_creados += 1
+        return estado
+
+    def transicion(self, estado, caracter):
+        """Aplica una transición desde un estado; SIN_TRANSICION si ninguna cadena que siga así coincide"""
+        if estado == SIN_TRANSICION:
+            return SIN_TRANSICION
+        clase = self._clase(caracter)
+        destino = estado.siguientes[clase]
+        if destino is None:
+            destino = self._calcular_transicion(estado, clase)
+        return destino
+
+    def _calcular_transicion(self, estado, clase):
+        """Calcula (y guarda en el estado) el destino de una transición con una clase"""
+        acepta = self._acepta
+        alcanzados = [self._siguientes[posicion] for posicion in estado.posiciones
+                      if acepta[posicion] is not None and clase in acepta[posicion]]
+        posiciones = self._clausura(alcanzados)
+        destino = self._registrar(posiciones) if posiciones else SIN_TRANSICION
+        estado.siguientes[clase] = destino
+        return destino
+
+    def es_final(self, estado):
+        """Indica si un estado acepta la cadena leída hasta él"""
+        return estado != SIN_TRANSICION and estado.es_final
+
+    @property
+    def num_estados(self):
+        """Estados del AFD que hay en caché en este momento"""
+        return len(self._estados)
+
+    def procesar_cadena(self, cadena):
+        """Procesa una cadena y retorna si coincide por completo con alguna expresión"""
+        cadena = cadena.upper().strip()
+        estado = self.estado_inicial
+        for clase in self._clases_de(cadena):
+            siguiente = estado.siguientes[clase]
+            if siguiente is None:
+                siguiente = self._calcular_transicion(estado, clase)
+            if siguiente == SIN_TRANSICION:
+                return False, None
+            estado = siguiente
+        if estado.es_final:
+            return True, cadena
+        return False, None
+
+    def es_palabra_valida(self, palabra):
+        """Verifica si una palabra coincide con alguna de las expresiones"""
+        aceptada, palabra_reconocida = self.procesar_cadena(palabra)
+        return aceptada
+
+    def obtener_palabra_reconocida(self, palabra):
+        """Obtiene la palabra reconocida, o None si no coincide con ninguna expresión"""
+        aceptada, palabra_reconocida = self.procesar_cadena(palabra)
+        return palabra_reconocida if aceptada else None
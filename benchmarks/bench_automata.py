@@ -0,0 +1,147 @@
+"""Mide la construcción, la minimización y procesar_cadena sobre diccionarios sintéticos.
+
+Uso: python benchmarks/bench_automata.py [--tamanos 100 1000 ...] [--longitudes 6 10]
+         [--prefijo-compartido 0.0 0.5] [--consultas N] [--paralelo [--procesos 1 4 ...]]
+         [--filtrado] [--salida ruta.json]
+"""
+
+import argparse
+
+import os
+
+import random
+
+import string
+
+import time
+
+from comun import guardar_resultados, ruta_resultados
+
+from automata import AutomataFinitoDeterminista
+
+
+
+TAMANOS = [10 ** 2, 10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6]
+
+LONGITUDES = [6, 10]
+
+PREFIJOS_COMPARTIDOS = [0.0, 0.5]
+
+CONSULTAS = 20000
+
+PROCESOS = sorted({1, os.cpu_count() or 1})
+
+
+
+def generar_diccionario(cantidad, longitud_media, prefijo_compartido, semilla=0):
+    """Genera `cantidad` palabras distintas en mayúsculas. Una fracción `prefijo_compartido`
+    empieza con uno de unos pocos prefijos comunes de la mitad de la longitud media"""
+    generador = random.Random(semilla)
+    letras = string.ascii_uppercase
+    prefijos = ["".join(generador.choice(letras) for _ in range(max(1, longitud_media // 2)))
+                for _ in range(max(1, cantidad // 1000))]
+    palabras = set()
+    while len(palabras) < cantidad:
+        longitud = max(1, int(generador.gauss(longitud_media, longitud_media / 4)))
+        if generador.random() < prefijo_compartido:
+            prefijo = generador.choice(prefijos)
+            palabra = prefijo + "".join(generador.choice(letras) for _ in range(max(1, longitud - len(prefijo))))
+        else:
+            palabra = "".join(generador.choice(letras) for _ in range(longitud))
+        palabras.add(palabra)
+    return list(palabras)
+
+
+def medir(funcion, *argumentos):
+    """Ejecuta la función una vez y retorna (resultado, segundos)"""
+    inicio = time.perf_counter()
+    resultado = funcion(*argumentos)
+    return resultado, time.perf_counter() - inicio
+
+
+def medir_diccionario(cantidad, longitud_media, prefijo_compartido, consultas, procesos=(), filtrado=False):
+    palabras = generar_diccionario(cantidad, longitud_media, prefijo_compartido)
+
+    automata, segundos_construccion = medir(AutomataFinitoDeterminista, palabras)
+    estados_trie = automata.num_estados
+    transiciones_trie = automata.num_transiciones
+    _, segundos_minimizacion = medir(automata.minimizar)
+
+    # Mitad de consultas aceptadas y mitad con la última letra cambiada (casi siempre rechazadas)
+    generador = random.Random(1)
+    aceptadas = [generador.choice(palabras) for _ in range(consultas // 2)]
+    rechazadas = [palabra[:-1] + ("A" if palabra[-1] != "A" else "B") for palabra in aceptadas]
+    cadenas = aceptadas + rechazadas
+    _, segundos_consultas = medir(lambda: [automata.procesar_cadena(cadena) for cadena in cadenas])
+
+    # Construcción y minimización repartidas entre procesos (solo con --paralelo); debe dar el mismo AFD mínimo
+    paralela = []
+    for cantidad_procesos in procesos:
+        automata_paralelo, segundos = medir(AutomataFinitoDeterminista.construir_en_paralelo, palabras, cantidad_procesos)
+        assert automata_paralelo.num_estados == automata.num_estados
+        paralela.append({"procesos": cantidad_procesos, "segundos": segundos})
+
+    resultado = {
+        "palabras": cantidad,
+        "longitud_media": longitud_media,
+        "prefijo_compartido": prefijo_compartido,
+        "construccion_s": segundos_construccion,
+        "minimizacion_s": segundos_minimizacion,
+        "estados_trie": estados_trie,
+        "transiciones_trie": transiciones_trie,
+        "estados_minimo": automata.num_estados,
+        "transiciones_minimo": automata.num_transiciones,
+        "consultas": len(cadenas),
+        "procesar_cadena_us": segundos_consultas / len(cadenas) * 1e6,
+        "construccion_paralela": paralela,
+    }
+
+    if filtrado:
+        # Filtrar contra una lista de bloqueo (una de cada diez palabras): producto perezoso
+        # frente a reconstruir desde las cadenas; deben dar el mismo AFD mínimo
+        bloqueo = AutomataFinitoDeterminista(palabras[::10])
+        sin_bloqueo, resultado["diferencia_s"] = medir(automata.diferencia, bloqueo, True)
+        def reconstruir():
+            reconstruido = AutomataFinitoDeterminista(sorted(set(palabras) - set(palabras[::10])))
+            reconstruido.minimizar()
+            return reconstruido
+        reconstruido, resultado["reconstruccion_filtrada_s"] = medir(reconstruir)
+        assert sin_bloqueo.num_estados == reconstruido.num_estados
+
+    return resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tamanos", type=int, nargs="+", default=TAMANOS)
+    parser.add_argument("--longitudes", type=int, nargs="+", default=LONGITUDES)
+    parser.add_argument("--prefijo-compartido", type=float, nargs="+", default=PREFIJOS_COMPARTIDOS)
+    parser.add_argument("--consultas", type=int, default=CONSULTAS)
+    parser.add_argument("--paralelo", action="store_true", help="medir también construir_en_paralelo")
+    parser.add_argument("--procesos", type=int, nargs="+", default=PROCESOS)
+    parser.add_argument("--filtrado", action="store_true", help="medir también el filtrado con diferencia")
+    parser.add_argument("--salida", default=ruta_resultados("automata"))
+    argumentos = parser.parse_args()
+
+    resultados = []
+    for cantidad in argumentos.tamanos:
+        for longitud_media in argumentos.longitudes:
+            for prefijo_compartido in argumentos.prefijo_compartido:
+                resultado = medir_diccionario(cantidad, longitud_media, prefijo_compartido,
+                                              argumentos.consultas, argumentos.procesos if argumentos.paralelo else (),
+                                              argumentos.filtrado)
+                resultados.append(resultado)
+                paralela = "".join(f", {medida['segundos']:.3f} s en paralelo con {medida['procesos']}"
+                                   for medida in resultado["construccion_paralela"])
+                print(f"{cantidad:>8} palabras, longitud {longitud_media:>2}, prefijo {prefijo_compartido:.2f}: "
+                      f"construcción {resultado['construccion_s']:.3f} s{paralela}, "
+                      f"minimización {resultado['minimizacion_s']:.3f} s, "
+                      f"estados {resultado['estados_trie']} -> {resultado['estados_minimo']}, "
+                      f"procesar_cadena {resultado['procesar_cadena_us']:.2f} µs" +
+                      (f", filtrar con diferencia {resultado['diferencia_s']:.3f} s "
+                       f"(reconstruyendo {resultado['reconstruccion_filtrada_s']:.3f} s)" if argumentos.filtrado else ""))
+    guardar_resultados(argumentos.salida, resultados)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Mide el costo por tick de las fases de actualización y dibujo de Juego con una cantidad
+configurable de palabras, disparos y partículas en pantalla.
+
+Uso: python benchmarks/bench_juego.py [--palabras 10 100 1000] [--disparos 10 100]
+         [--particulas 0 1000] [--ticks N] [--salida ruta.json]
+"""
+
+import argparse
+
+import os
+
+import statistics
+
+import time
+
+from comun import guardar_resultados, ruta_resultados
+
+# El dibujo se mide sobre una superficie sin abrir una ventana real
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+from main import ALTO_VENTANA, ANCHO_VENTANA, CAPACIDAD_PARTICULAS, Juego, RelojLogico
+
+
+
+PALABRAS = [10, 100, 1000]
+
+DISPAROS = [10, 100]
+
+PARTICULAS = [0, 1000]
+
+TICKS = 300
+
+
+
+def completar_entidades(juego, palabras, disparos, particulas):
+    """Repone las entidades que desaparecieron para medir siempre con la misma cantidad"""
+    generador = juego.aleatorio
+    while len(juego.palabras_por_x) < palabras:
+        palabra = juego.pool_palabras.obtener(generador.randint(50, ANCHO_VENTANA - 50), generador.randint(0, ALTO_VENTANA // 2),
+                                              generador.choice(juego.palabras_juego), generador)
+        juego.palabras_cayendo.append(palabra)
+        juego.registrar_palabra(palabra)
+    while len(juego.nave.disparos) < disparos:
+        juego.nave.disparos.append(juego.nave.pool_disparos.obtener(generador.randint(0, ANCHO_VENTANA), ALTO_VENTANA - 80,
+                                                                    generador.choice(juego.palabras_juego)))
+    # emitir() descarta lo que excede la capacidad: pedir más nunca llenaría el sistema
+    particulas = min(particulas, juego.explosiones.capacidad)
+    while len(juego.explosiones) < particulas:
+        juego.explosiones.emitir(generador.randint(0, ANCHO_VENTANA), generador.randint(0, ALTO_VENTANA),
+                                 particulas - len(juego.explosiones), generador)
+
+
+def medir_escenario(palabras, disparos, particulas, ticks):
+    juego = Juego(semilla=0, reloj=RelojLogico(), mostrar_mensajes=False)
+    tiempos_actualizar = []
+    tiempos_dibujar = []
+
+    for _ in range(ticks):
+        completar_entidades(juego, palabras, disparos, particulas)
+        juego.vidas = 3  # La simulación no termina por palabras perdidas
+
+        inicio = time.perf_counter()
+        juego.actualizar()
+        medio = time.perf_counter()
+        juego.renderizador.presentar(juego.dibujar())
+        fin = time.perf_counter()
+        juego.obtener_ticks.avanzar()
+
+        tiempos_actualizar.append((medio - inicio) * 1000)
+        tiempos_dibujar.append((fin - medio) * 1000)
+
+    return {
+        "palabras": palabras,
+        "disparos": disparos,
+        "particulas": particulas,
+        "ticks": ticks,
+        "actualizar_ms": statistics.mean(tiempos_actualizar),
+        "actualizar_p95_ms": statistics.quantiles(tiempos_actualizar, n=20)[-1],
+        "dibujar_ms": statistics.mean(tiempos_dibujar),
+        "dibujar_p95_ms": statistics.quantiles(tiempos_dibujar, n=20)[-1],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--palabras", type=int, nargs="+", default=PALABRAS)
+    parser.add_argument("--disparos", type=int, nargs="+", default=DISPAROS)
+    parser.add_argument("--particulas", type=int, nargs="+", default=PARTICULAS)
+    parser.add_argument("--ticks", type=int, default=TICKS)
+    parser.add_argument("--salida", default=ruta_resultados("juego"))
+    argumentos = parser.parse_args()
+    if max(argumentos.particulas) > CAPACIDAD_PARTICULAS:
+        parser.error(f"--particulas no puede superar la capacidad del sistema de partículas ({CAPACIDAD_PARTICULAS})")
+
+    resultados = []
+    for palabras in argumentos.palabras:
+        for disparos in argumentos.disparos:
+            for particulas in argumentos.particulas:
+                resultado = medir_escenario(palabras, disparos, particulas, argumentos.ticks)
+                resultados.append(resultado)
+                print(f"{palabras:>5} palabras, {disparos:>4} disparos, {particulas:>5} partículas: "
+                      f"actualizar {resultado['actualizar_ms']:.3f} ms (p95 {resultado['actualizar_p95_ms']:.3f}), "
+                      f"dibujar {resultado['dibujar_ms']:.3f} ms (p95 {resultado['dibujar_p95_ms']:.3f})")
+    guardar_resultados(argumentos.salida, resultados)
+
+
+if __name__ == "__main__":
+    main()
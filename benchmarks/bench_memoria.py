@@ -0,0 +1,122 @@
+"""Informe de memoria de las entidades del juego: bytes por Disparo y PalabraCayendo con
+__slots__ frente a las mismas clases con __dict__, y objetos creados durante una partida
+simulada una vez que los pools de entidades ya se llenaron.
+
+Uso: python benchmarks/bench_memoria.py [--entidades N] [--ticks N] [--salida ruta.json]
+"""
+
+import argparse
+
+import os
+
+import random
+
+import sys
+
+import tracemalloc
+
+from comun import guardar_resultados, ruta_resultados
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+from main import Disparo, Juego, PalabraCayendo
+
+
+
+ENTIDADES = 10000
+
+TICKS = 3000
+
+
+
+def clase_con_dict(clase):
+    """La misma entidad sin __slots__, como eran Disparo y PalabraCayendo antes de los pools"""
+    return type(f"{clase.__name__}ConDict", (), {"__init__": clase.__init__, "reiniciar": clase.reiniciar})
+
+
+def bytes_por_entidad(fabrica, cantidad):
+    """Memoria reservada por cada entidad creada con fabrica(), incluidos su Rect y su texto"""
+    tracemalloc.start()
+    inicio = tracemalloc.get_traced_memory()[0]
+    entidades = [fabrica() for _ in range(cantidad)]
+    usados = tracemalloc.get_traced_memory()[0] - inicio
+    tracemalloc.stop()
+    return (usados - sys.getsizeof(entidades)) / cantidad
+
+
+def medir_huella(cantidad):
+    generador = random.Random(0)
+    fabricas = {
+        "Disparo": lambda clase: lambda: clase(400, 520, "variable"),
+        "PalabraCayendo": lambda clase: lambda: clase(400, 0, "variable", generador),
+    }
+    resultados = []
+    for clase in (Disparo, PalabraCayendo):
+        fabrica = fabricas[clase.__name__]
+        resultados.append({
+            "entidad": clase.__name__,
+            "bytes_con_dict": bytes_por_entidad(fabrica(clase_con_dict(clase)), cantidad),
+            "bytes_con_slots": bytes_por_entidad(fabrica(clase), cantidad),
+        })
+    return resultados
+
+
+def disparar_a_la_primera(juego, tick):
+    """Guion de la partida: cada medio segundo dispara a la palabra que cae hace más tiempo"""
+    if tick % 30 == 0 and juego.palabras_cayendo:
+        return (juego.palabras_cayendo[0].palabra,)
+    return ()
+
+
+def medir_partida(ticks):
+    """Objetos de entidades creados y memoria retenida por main.py durante una partida,
+    después de un calentamiento que llena los pools"""
+    juego = Juego(sin_pantalla=True, semilla=0)
+    juego.simular(ticks, disparar_a_la_primera, detenerse_al_perder=False)
+    pools = (juego.nave.pool_disparos, juego.pool_palabras)
+    creadas_antes = [pool.creadas for pool in pools]
+    reutilizadas_antes = [pool.reutilizadas for pool in pools]
+
+    tracemalloc.start()
+    antes = tracemalloc.take_snapshot()
+    juego.simular(ticks, disparar_a_la_primera, detenerse_al_perder=False)
+    despues = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    filtro = [tracemalloc.Filter(True, os.path.join("*", "main.py"))]
+    diferencias = despues.filter_traces(filtro).compare_to(antes.filter_traces(filtro), "filename")
+    return {
+        "ticks": ticks,
+        "disparos_creados": juego.nave.pool_disparos.creadas - creadas_antes[0],
+        "disparos_reutilizados": juego.nave.pool_disparos.reutilizadas - reutilizadas_antes[0],
+        "palabras_creadas": juego.pool_palabras.creadas - creadas_antes[1],
+        "palabras_reutilizadas": juego.pool_palabras.reutilizadas - reutilizadas_antes[1],
+        "bloques_retenidos": sum(diferencia.count_diff for diferencia in diferencias),
+        "bytes_retenidos": sum(diferencia.size_diff for diferencia in diferencias),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entidades", type=int, default=ENTIDADES)
+    parser.add_argument("--ticks", type=int, default=TICKS)
+    parser.add_argument("--salida", default=ruta_resultados("memoria"))
+    argumentos = parser.parse_args()
+
+    huella = medir_huella(argumentos.entidades)
+    for resultado in huella:
+        print(f"{resultado['entidad']:>15}: {resultado['bytes_con_dict']:.0f} bytes con __dict__, "
+              f"{resultado['bytes_con_slots']:.0f} bytes con __slots__")
+
+    partida = medir_partida(argumentos.ticks)
+    print(f"Partida de {partida['ticks']} ticks con los pools llenos: "
+          f"{partida['disparos_creados']} disparos y {partida['palabras_creadas']} palabras creados, "
+          f"{partida['disparos_reutilizados']} y {partida['palabras_reutilizadas']} reutilizados; "
+          f"{partida['bloques_retenidos']} bloques ({partida['bytes_retenidos']} bytes) retenidos en main.py")
+
+    guardar_resultados(argumentos.salida, {"huella": huella, "partida": partida})
+
+
+if __name__ == "__main__":
+    main()
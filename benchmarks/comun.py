@@ -0,0 +1,58 @@
+"""Utilidades compartidas por los benchmarks: rutas, metadatos y escritura de resultados"""
+
+import json
+
+import os
+
+import platform
+
+import subprocess
+
+import sys
+
+import time
+
+
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DIRECTORIO_RESULTADOS = os.path.join(RAIZ, "benchmarks", "resultados")
+
+# Los benchmarks importan los módulos del juego desde la raíz del repositorio
+if RAIZ not in sys.path:
+    sys.path.insert(0, RAIZ)
+
+
+
+def commit_actual():
+    """Hash del commit actual, o None si no se puede consultar git"""
+    try:
+        resultado = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=RAIZ,
+                                   capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return resultado.stdout.strip()
+
+
+def metadatos():
+    """Datos del entorno para poder comparar resultados entre commits"""
+    return {
+        "commit": commit_actual(),
+        "fecha": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+    }
+
+
+def ruta_resultados(nombre):
+    """Ruta por defecto del JSON de un benchmark: benchmarks/resultados/<nombre>-<commit>.json"""
+    return os.path.join(DIRECTORIO_RESULTADOS, f"{nombre}-{commit_actual() or 'sin-commit'}.json")
+
+
+def guardar_resultados(ruta, resultados):
+    """Escribe los resultados junto con los metadatos del entorno"""
+    directorio = os.path.dirname(os.path.abspath(ruta))
+    os.makedirs(directorio, exist_ok=True)
+    with open(ruta, "w", encoding="utf-8") as archivo:
+        json.dump({"metadatos": metadatos(), "resultados": resultados}, archivo, indent=2, ensure_ascii=False)
+    print(f"Resultados guardados en {ruta}")
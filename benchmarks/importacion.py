@@ -0,0 +1,61 @@
+"""Mide el tiempo de importación del autómata sin pygame y lo compara con un presupuesto.
+
+Uso: python benchmarks/importacion.py [--presupuesto-ms N] [--repeticiones N]
+
+El presupuesto supone que existe el bytecode compilado (python -m compileall automata.py),
+como ocurre en los procesos de validación tras la primera ejecución.
+"""
+
+import argparse
+
+import os
+
+import subprocess
+
+import sys
+
+
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PRESUPUESTO_MS = 15
+
+REPETICIONES = 10
+
+
+
+def medir_importacion(modulo="automata"):
+    """Importa el módulo en un proceso nuevo y retorna su tiempo acumulado en milisegundos"""
+    codigo = f"import {modulo}, sys; sys.exit('pygame' in sys.modules)"
+    resultado = subprocess.run([sys.executable, "-X", "importtime", "-c", codigo],
+                               cwd=RAIZ, capture_output=True, text=True)
+    if resultado.returncode != 0:
+        raise RuntimeError(f"Importar '{modulo}' cargó pygame o falló:\n{resultado.stderr}")
+
+    # Formato de -X importtime: "import time: propio | acumulado | módulo" (en microsegundos)
+    for linea in resultado.stderr.splitlines():
+        partes = linea.split("|")
+        if len(partes) == 3 and partes[2].strip() == modulo:
+            return int(partes[1]) / 1000
+    raise RuntimeError(f"No se encontró '{modulo}' en la salida de -X importtime")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--presupuesto-ms", type=float, default=PRESUPUESTO_MS)
+    parser.add_argument("--repeticiones", type=int, default=REPETICIONES)
+    argumentos = parser.parse_args()
+
+    # El mínimo descarta el ruido de otros procesos de la máquina
+    tiempos = [medir_importacion() for _ in range(argumentos.repeticiones)]
+    mejor = min(tiempos)
+    print(f"Importación de automata: mínimo {mejor:.2f} ms, máximo {max(tiempos):.2f} ms "
+          f"(presupuesto {argumentos.presupuesto_ms:.2f} ms)")
+    if mejor > argumentos.presupuesto_ms:
+        print("❌ Se excedió el presupuesto de importación")
+        sys.exit(1)
+    print("✓ Dentro del presupuesto")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,22 @@
 import pygame
 
+import bisect
+
+import csv
+
+import json
+
 import random
 
 import sys
 
+import time
 
+from array import array
 
-# Inicializar Pygame
+from collections import OrderedDict, deque
 
-pygame.init()
+from automata import AutomataFinitoDeterminista, PALABRAS_JUEGO, SIN_TRANSICION, _numpy
 
 
 
@@ -20,6 +28,27 @@ ALTO_VENTANA = 600
 
 FPS = 60
 
+TAMANO_CACHE_AFD = 256
+
+DISTANCIA_TOLERADA = 1  # Errores de tipeo tolerados al disparar
+
+LONGITUD_MAXIMA_TEXTO = 20  # Caracteres que admite el campo de texto
+
+CAPACIDAD_PARTICULAS = 4096
+
+PRESUPUESTO_CACHE_TEXTO = 4 * 1024 * 1024  # Bytes de superficies de texto en caché
+
+CAPACIDAD_DISPAROS = 64  # Disparos libres que se guardan para reutilizar
+
+CAPACIDAD_PALABRAS = 256  # Palabras libres que se guardan para reutilizar
+
+RUTA_PERFIL = "perfil_frames"  # Se exportan .csv y .json al terminar el juego con --perfil
+
+UMBRAL_REGIONES = 0.5  # Fracción de la ventana a partir de la cual conviene un flip completo
+
+# Eventos tras los que el contenido de la ventana ya no es confiable (WINDOWEXPOSED existe desde pygame 2)
+EVENTOS_EXPOSICION = (pygame.VIDEOEXPOSE, getattr(pygame, "WINDOWEXPOSED", pygame.VIDEOEXPOSE))
+
 
 
 # Colores
@@ -38,115 +67,86 @@ AMARILLO = (255, 255, 0)
 
 CYAN = (0, 255, 255)
 
+VERDE_OSCURO = (0, 150, 0)
 
+GRIS = (150, 150, 150)
 
-# Lista de palabras para que caigan
 
-PALABRAS_JUEGO = [
 
-    "PYTHON", "JUEGO", "CODIGO", "NAVE", "DISPARO", "PALABRA", "TEXTO", "LETRA",
 
-    "PROGRAMA", "FUNCION", "CLASE", "OBJETO", "METODO", "VARIABLE", "BUCLE",
+class CacheTexto:
+    """Superficies de texto ya renderizadas, con desalojo LRU al superar un presupuesto de bytes"""
 
-    "CONDICIONAL", "ARRAY", "LISTA", "DICCIONARIO", "CADENA", "NUMERO", "BOOLEAN"
+    def __init__(self, presupuesto_bytes):
+        self.presupuesto_bytes = presupuesto_bytes
+        self.bytes_usados = 0
+        self.superficies = OrderedDict()
+        self.aciertos = 0
+        self.fallos = 0
+        self.desalojos = 0
 
-]
+    def renderizar(self, fuente, texto, antialias, color):
+        """Equivalente a fuente.render(texto, antialias, color), reutilizando la superficie si ya existe"""
+        clave = (fuente, texto, antialias, color)
+        superficie = self.superficies.get(clave)
+        if superficie is not None:
+            self.superficies.move_to_end(clave)
+            self.aciertos += 1
+            return superficie
 
+        self.fallos += 1
+        superficie = fuente.render(texto, antialias, color)
+        self.superficies[clave] = superficie
+        self.bytes_usados += superficie.get_pitch() * superficie.get_height()
+        while self.bytes_usados > self.presupuesto_bytes and len(self.superficies) > 1:
+            _, desalojada = self.superficies.popitem(last=False)
+            self.bytes_usados -= desalojada.get_pitch() * desalojada.get_height()
+            self.desalojos += 1
+        return superficie
 
 
-class AutomataFinitoDeterminista:
-    def __init__(self, palabras):
-        """Inicializa el AFD con una lista de palabras válidas"""
-        self.palabras = [palabra.upper() for palabra in palabras]
-        self.estados = {}
-        self.estado_inicial = 0
-        self.estados_finales = set()
-        self.transiciones = {}
-        self.construir_automata()
-    
-    def construir_automata(self):
-        """Construye el AFD usando un trie (árbol de prefijos)"""
-        # Crear estado inicial
-        self.estados[0] = {"es_final": False, "palabra": ""}
-        contador_estado = 1
-        
-        for palabra in self.palabras:
-            estado_actual = 0
-            
-            for i, caracter in enumerate(palabra):
-                # Buscar si ya existe una transición desde el estado actual con este carácter
-                if (estado_actual, caracter) not in self.transiciones:
-                    # Crear nuevo estado
-                    nuevo_estado = contador_estado
-                    contador_estado += 1
-                    
-                    # Agregar el nuevo estado
-                    es_final = (i == len(palabra) - 1)
-                    self.estados[nuevo_estado] = {
-                        "es_final": es_final,
-                        "palabra": palabra if es_final else ""
-                    }
-                    
-                    # Crear transición
-                    self.transiciones[(estado_actual, caracter)] = nuevo_estado
-                    
-                    # Si es estado final, agregarlo al conjunto
-                    if es_final:
-                        self.estados_finales.add(nuevo_estado)
-                else:
-                    # Usar estado existente
-                    nuevo_estado = self.transiciones[(estado_actual, caracter)]
-                    
-                    # Si llegamos al final de la palabra, marcar como final
-                    if i == len(palabra) - 1:
-                        self.estados[nuevo_estado]["es_final"] = True
-                        self.estados[nuevo_estado]["palabra"] = palabra
-                        self.estados_finales.add(nuevo_estado)
-                
-                estado_actual = nuevo_estado
-    
-    def procesar_cadena(self, cadena):
-        """Procesa una cadena y retorna si es aceptada por el autómata"""
-        cadena = cadena.upper().strip()
-        estado_actual = self.estado_inicial
-        
-        for caracter in cadena:
-            if (estado_actual, caracter) in self.transiciones:
-                estado_actual = self.transiciones[(estado_actual, caracter)]
+
+# Caché compartida por las palabras, los disparos, el campo de texto y el HUD
+CACHE_TEXTO = CacheTexto(PRESUPUESTO_CACHE_TEXTO)
+
+
+
+class PoolEntidades:
+    """Lista libre de entidades (disparos o palabras) que se reutilizan en lugar de crear
+    un objeto nuevo en cada aparición. Guarda como máximo `capacidad` entidades libres"""
+
+    def __init__(self, clase, capacidad, atributo_activo):
+        self.clase = clase
+        self.capacidad = capacidad
+        self.atributo_activo = atributo_activo
+        self.libres = []
+        self.creadas = 0
+        self.reutilizadas = 0
+
+    def obtener(self, *argumentos):
+        """Equivalente a clase(*argumentos), reutilizando una entidad libre si hay alguna"""
+        if self.libres:
+            entidad = self.libres.pop()
+            entidad.reiniciar(*argumentos)
+            self.reutilizadas += 1
+            return entidad
+        self.creadas += 1
+        return self.clase(*argumentos)
+
+    def liberar(self, entidad):
+        if len(self.libres) < self.capacidad:
+            self.libres.append(entidad)
+
+    def compactar(self, entidades):
+        """Deja en la misma lista solo las entidades activas, en su orden, y devuelve el resto al pool"""
+        escritura = 0
+        for entidad in entidades:
+            if getattr(entidad, self.atributo_activo):
+                entidades[escritura] = entidad
+                escritura += 1
             else:
-                return False, None  # Transición no válida
-        
-        # Verificar si el estado actual es final
-        if estado_actual in self.estados_finales:
-            return True, self.estados[estado_actual]["palabra"]
-        else:
-            return False, None
-    
-    def es_palabra_valida(self, palabra):
-        """Verifica si una palabra es válida según el autómata"""
-        aceptada, palabra_reconocida = self.procesar_cadena(palabra)
-        return aceptada
-    
-    def obtener_palabra_reconocida(self, palabra):
-        """Obtiene la palabra completa reconocida por el autómata"""
-        aceptada, palabra_reconocida = self.procesar_cadena(palabra)
-        return palabra_reconocida if aceptada else None
-    
-    def mostrar_automata(self):
-        """Muestra la estructura del autómata (para depuración)"""
-        print("=== AUTÓMATA FINITO DETERMINISTA ===")
-        print(f"Estado inicial: {self.estado_inicial}")
-        print(f"Estados finales: {self.estados_finales}")
-        print("\nEstados:")
-        for estado, info in self.estados.items():
-            tipo = "FINAL" if info["es_final"] else "INTERMEDIO"
-            palabra = f" (palabra: {info['palabra']})" if info["palabra"] else ""
-            print(f"  Estado {estado}: {tipo}{palabra}")
-        
-        print("\nTransiciones:")
-        for (origen, caracter), destino in self.transiciones.items():
-            print(f"  δ({origen}, '{caracter}') = {destino}")
-        print("=====================================\n")
+                self.liberar(entidad)
+        del entidades[escritura:]
 
 
 
@@ -158,6 +158,7 @@ class Nave:
         self.alto = 40
         self.velocidad = 12
         self.disparos = []
+        self.pool_disparos = PoolEntidades(Disparo, CAPACIDAD_DISPAROS, "activo")
 
 
 
@@ -165,7 +166,7 @@ class Nave:
 
         # Cuerpo principal de la nave
 
-        pygame.draw.polygon(pantalla, VERDE, [
+        region = pygame.draw.polygon(pantalla, VERDE, [
 
             (self.x, self.y + self.alto),
 
@@ -195,6 +196,8 @@ class Nave:
 
                          (self.x + self.ancho - 13, self.y + self.alto - 15, 8, 10))
 
+        return region
+
 
 
     def mover(self, direccion):
@@ -237,7 +240,7 @@ class Nave:
 
         if palabra_objetivo and len(palabra_objetivo) > 0:
 
-            nuevo_disparo = Disparo(self.x + self.ancho // 2, self.y, palabra_objetivo)
+            nuevo_disparo = self.pool_disparos.obtener(self.x + self.ancho // 2, self.y, palabra_objetivo)
 
             self.disparos.append(nuevo_disparo)
 
@@ -245,7 +248,7 @@ class Nave:
 
     def actualizar_disparos(self):
 
-        self.disparos = [disparo for disparo in self.disparos if disparo.activo]
+        self.pool_disparos.compactar(self.disparos)
 
         for disparo in self.disparos:
 
@@ -256,14 +259,23 @@ class Nave:
 
 
 class Disparo:
+    __slots__ = ("x", "y", "velocidad", "palabra", "activo", "ancho", "alto", "rect")
+
     def __init__(self, x, y, palabra):
+        self.velocidad = 8
+        self.ancho = 4
+        self.alto = 15
+        self.rect = pygame.Rect(0, 0, self.ancho, self.alto)
+        self.reiniciar(x, y, palabra)
+
+    def reiniciar(self, x, y, palabra):
+        """Deja el disparo como recién creado para reutilizarlo desde el pool"""
         self.x = x
         self.y = y
-        self.velocidad = 8
         self.palabra = palabra.upper()
         self.activo = True
-        self.ancho = 4
-        self.alto = 15
+        self.rect.x = self.x - 2
+        self.rect.y = self.y
 
 
 
@@ -271,6 +283,8 @@ class Disparo:
 
         self.y -= self.velocidad
 
+        self.rect.y = self.y
+
         if self.y < 0:
 
             self.activo = False
@@ -291,30 +305,41 @@ class Disparo:
 
             # Dibujar la palabra encima del disparo
 
-            texto_superficie = fuente.render(self.palabra, True, CYAN)
+            texto_superficie = CACHE_TEXTO.renderizar(fuente, self.palabra, True, CYAN)
 
             texto_rect = texto_superficie.get_rect(center=(self.x, self.y - 20))
 
             pantalla.blit(texto_superficie, texto_rect)
 
+            return texto_rect.union((self.x - 2, self.y, self.ancho, self.alto))
+
 
 
     def obtener_rect(self):
 
-        return pygame.Rect(self.x - 2, self.y, self.ancho, self.alto)
+        return self.rect
 
 
 
 
 
 class PalabraCayendo:
-    def __init__(self, x, y, palabra):
+    __slots__ = ("x", "y", "palabra", "velocidad", "activa", "color", "rect")
+
+    def __init__(self, x, y, palabra, generador=random):
+        self.rect = pygame.Rect(0, 0, 100, 30)
+        self.reiniciar(x, y, palabra, generador)
+
+    def reiniciar(self, x, y, palabra, generador=random):
+        """Deja la palabra como recién creada para reutilizarla desde el pool"""
         self.x = x
         self.y = y
         self.palabra = palabra.upper()
-        self.velocidad = random.uniform(0.5, 1.5)
+        self.velocidad = generador.uniform(0.5, 1.5)
         self.activa = True
         self.color = BLANCO
+        self.rect.x = self.x - 50
+        self.rect.y = int(self.y - 15)
 
 
 
@@ -322,6 +347,8 @@ class PalabraCayendo:
 
         self.y += self.velocidad
 
+        self.rect.y = int(self.y - 15)
+
         if self.y > ALTO_VENTANA:
 
             self.activa = False
@@ -334,7 +361,7 @@ class PalabraCayendo:
 
             # Fondo para la palabra
 
-            texto_superficie = fuente.render(self.palabra, True, self.color)
+            texto_superficie = CACHE_TEXTO.renderizar(fuente, self.palabra, True, self.color)
 
             texto_rect = texto_superficie.get_rect(center=(self.x, self.y))
 
@@ -350,25 +377,189 @@ class PalabraCayendo:
 
             pantalla.blit(texto_superficie, texto_rect)
 
+            return texto_rect.inflate(10, 5)
+
 
 
     def obtener_rect(self):
 
-        return pygame.Rect(self.x - 50, self.y - 15, 100, 30)
+        return self.rect
+
+
+
+
+
+class SistemaParticulas:
+    """Partículas de las explosiones guardadas por columnas en arreglos preasignados: de
+    NumPy, actualizados de forma vectorizada, o de array con un bucle si no está instalado"""
+
+    def __init__(self, capacidad, colores=(AMARILLO, ROJO, BLANCO), radio=3, vida=30):
+        self.capacidad = capacidad
+        self.colores = colores
+        self.radio = radio
+        self.vida_inicial = vida
+        self.cantidad = 0
+
+        self.np = np = _numpy()
+
+        # Una columna por atributo; las partículas vivas ocupan las posiciones [0, cantidad)
+        if np is not None:
+            self.x = np.zeros(capacidad)
+            self.y = np.zeros(capacidad)
+            self.vel_x = np.zeros(capacidad)
+            self.vel_y = np.zeros(capacidad)
+            self.vida = np.zeros(capacidad, dtype=np.int32)
+            self.color = np.zeros(capacidad, dtype=np.uint8)
+        else:
+            self.x = array("d", [0.0]) * capacidad
+            self.y = array("d", [0.0]) * capacidad
+            self.vel_x = array("d", [0.0]) * capacidad
+            self.vel_y = array("d", [0.0]) * capacidad
+            self.vida = array("i", [0]) * capacidad
+            self.color = array("B", [0]) * capacidad
+        self.sprites = None
+
+    def __len__(self):
+        return self.cantidad
+
+    def emitir(self, x, y, cantidad=10, generador=random):
+        """Agrega partículas alrededor de (x, y); las que excedan la capacidad se descartan"""
+        for _ in range(min(cantidad, self.capacidad - self.cantidad)):
+            i = self.cantidad
+            self.x[i] = x + generador.randint(-20, 20)
+            self.y[i] = y + generador.randint(-20, 20)
+            self.vel_x[i] = generador.uniform(-3, 3)
+            self.vel_y[i] = generador.uniform(-3, 3)
+            self.vida[i] = self.vida_inicial
+            self.color[i] = generador.randrange(len(self.colores))
+            self.cantidad += 1
+
+    def actualizar(self):
+        """Mueve las partículas y quita las que terminaron su vida"""
+        if self.np is not None:
+            self.actualizar_vectorizado()
+            return
+        x, y, vel_x, vel_y, vida, color = self.x, self.y, self.vel_x, self.vel_y, self.vida, self.color
+        i = 0
+        while i < self.cantidad:
+            if vida[i] <= 1:
+                # Quitar intercambiando con la última: no desplaza el resto de partículas
+                ultima = self.cantidad - 1
+                x[i], y[i], vel_x[i], vel_y[i] = x[ultima], y[ultima], vel_x[ultima], vel_y[ultima]
+                vida[i], color[i] = vida[ultima], color[ultima]
+                self.cantidad = ultima
+                continue
+            vida[i] -= 1
+            x[i] += vel_x[i]
+            y[i] += vel_y[i]
+            i += 1
+
+    def actualizar_vectorizado(self):
+        """actualizar() con NumPy: mueve y envejece todas las partículas a la vez y compacta
+        las vivas al principio de cada columna con una máscara"""
+        cantidad = self.cantidad
+        vida = self.vida[:cantidad]
+        vida -= 1
+        self.x[:cantidad] += self.vel_x[:cantidad]
+        self.y[:cantidad] += self.vel_y[:cantidad]
+        vivas = vida > 0
+        restantes = int(self.np.count_nonzero(vivas))
+        if restantes < cantidad:
+            for columna in (self.x, self.y, self.vel_x, self.vel_y, self.vida, self.color):
+                columna[:restantes] = columna[:cantidad][vivas]
+            self.cantidad = restantes
+
+    def dibujar(self, pantalla):
+        """Dibuja todas las partículas con una sola llamada a blits y retorna sus rectángulos"""
+        if self.sprites is None:
+            # Un círculo ya dibujado por color; el negro del fondo queda transparente
+            lado = 2 * self.radio + 1
+            self.sprites = []
+            for color in self.colores:
+                sprite = pygame.Surface((lado, lado))
+                sprite.set_colorkey(NEGRO)
+                pygame.draw.circle(sprite, color, (self.radio, self.radio), self.radio)
+                self.sprites.append(sprite)
+        sprites, x, y, color, radio = self.sprites, self.x, self.y, self.color, self.radio
+        if self.np is not None:
+            # Convertir las columnas a listas de enteros de una vez (truncando como int())
+            cantidad = self.cantidad
+            return pantalla.blits(list(zip(map(sprites.__getitem__, color[:cantidad].tolist()),
+                                           zip((x[:cantidad].astype(int) - radio).tolist(),
+                                               (y[:cantidad].astype(int) - radio).tolist()))))
+        return pantalla.blits([(sprites[color[i]], (int(x[i]) - radio, int(y[i]) - radio))
+                               for i in range(self.cantidad)])
 
 
 
 
 
 class CampoTexto:
-    def __init__(self, x, y, ancho, alto):
+    def __init__(self, x, y, ancho, alto, automata=None):
         self.rect = pygame.Rect(x, y, ancho, alto)
         self.texto = ""
         self.activo = True
         self.color = BLANCO
         self.color_texto = NEGRO
 
-
+        # Estado del AFD tras cada carácter escrito (el tope es el estado actual)
+        self.automata = automata
+        self.pila_estados = [automata.estado_inicial] if automata else []
+        self._sugerencia = ("", None)  # (texto, mejor completación) de la última consulta
+
+    @property
+    def estado_actual(self):
+        """Estado del AFD alcanzado con el texto escrito hasta ahora"""
+        return self.pila_estados[-1] if self.pila_estados else SIN_TRANSICION
+
+    @property
+    def es_muerto(self):
+        """Indica si ningún texto que empiece así puede ser aceptado"""
+        return self.automata is not None and self.estado_actual == SIN_TRANSICION
+
+    @property
+    def es_aceptado(self):
+        """Indica si el texto escrito es una palabra válida"""
+        return not self.es_muerto and self.automata is not None and self.automata.es_final(self.estado_actual)
+
+    @property
+    def completaciones_vivas(self):
+        """Cantidad de palabras válidas que empiezan con el texto escrito"""
+        if self.automata is None:
+            return 0
+        return self.automata.completaciones(self.estado_actual)
+
+    @property
+    def sugerencia(self):
+        """Palabra válida de mayor puntaje que empieza con el texto escrito, o None"""
+        if self.automata is None or not self.texto or self.es_muerto:
+            return None
+        texto, sugerencia = self._sugerencia
+        if texto != self.texto:
+            completaciones = self.automata.completar(self.texto, 1)
+            sugerencia = completaciones[0] if completaciones else None
+            self._sugerencia = (self.texto, sugerencia)
+        return sugerencia
+
+    def escribir(self, nuevo_texto):
+        """Agrega texto al campo avanzando una transición del AFD por carácter. Los espacios
+        se ignoran: procesar_cadena los descarta al disparar y ninguna palabra los contiene.
+        Lo que exceda LONGITUD_MAXIMA_TEXTO se descarta"""
+        nuevo_texto = "".join(caracter for caracter in nuevo_texto if not caracter.isspace())
+        nuevo_texto = nuevo_texto[:max(0, LONGITUD_MAXIMA_TEXTO - len(self.texto))]
+        self.texto += nuevo_texto
+        if self.automata is not None:
+            for caracter in nuevo_texto:
+                self.pila_estados.append(self.automata.transicion(self.estado_actual, caracter))
+
+    def sincronizar(self):
+        """Recalcula la pila de estados desde el texto (p. ej. si el autómata cambió)"""
+        if self.automata is None:
+            return
+        self.pila_estados = [self.automata.estado_inicial]
+        self._sugerencia = ("", None)
+        for caracter in self.texto:
+            self.pila_estados.append(self.automata.transicion(self.pila_estados[-1], caracter))
 
     def manejar_evento(self, evento):
 
@@ -380,17 +571,32 @@ class CampoTexto:
 
                 self.texto = ""
 
+                del self.pila_estados[1:]
+
                 return texto_actual
 
             elif evento.key == pygame.K_BACKSPACE:
 
                 self.texto = self.texto[:-1]
 
+                if len(self.pila_estados) > 1:
+
+                    self.pila_estados.pop()
+
+            elif evento.key == pygame.K_TAB:
+
+                # Completar con la sugerencia que se muestra en gris (escribir respeta el límite de longitud)
+                sugerencia = self.sugerencia
+
+                if sugerencia:
+
+                    self.escribir(sugerencia[len(self.texto):])
+
             else:
 
-                if len(self.texto) < 20:  # Limitar longitud
+                if len(self.texto) < LONGITUD_MAXIMA_TEXTO:  # Limitar longitud
 
-                    self.texto += evento.unicode.upper()
+                    self.escribir(evento.unicode.upper())
 
         return None
 
@@ -406,11 +612,29 @@ class CampoTexto:
 
 
 
-        # Dibujar el texto
+        # Dibujar el texto (rojo si ya no puede formar una palabra, verde si es válida)
+
+        if self.es_muerto:
+            color_texto = ROJO
+        elif self.es_aceptado:
+            color_texto = VERDE_OSCURO
+        else:
+            color_texto = self.color_texto
+
+        texto_superficie = CACHE_TEXTO.renderizar(fuente, self.texto, True, color_texto)
+
+        region = self.rect.union(pantalla.blit(texto_superficie, (self.rect.x + 5, self.rect.y + 5)))
 
-        texto_superficie = fuente.render(self.texto, True, self.color_texto)
+        # Resto de la mejor completación en gris (TAB la acepta)
+        sugerencia = self.sugerencia
+        if sugerencia and sugerencia != self.texto:
+            texto_sugerencia = CACHE_TEXTO.renderizar(fuente, sugerencia[len(self.texto):], True, GRIS)
+            region.union_ip(pantalla.blit(texto_sugerencia, (self.rect.x + 5 + texto_superficie.get_width(), self.rect.y + 5)))
 
-        pantalla.blit(texto_superficie, (self.rect.x + 5, self.rect.y + 5))
+        # Cantidad de palabras que todavía pueden completarse
+        if self.automata is not None and self.texto:
+            texto_completaciones = CACHE_TEXTO.renderizar(fuente, f"{self.completaciones_vivas} posibles", True, color_texto if self.es_muerto else CYAN)
+            region.union_ip(pantalla.blit(texto_completaciones, (self.rect.right + 10, self.rect.y + 5)))
 
 
 
@@ -420,104 +644,312 @@ class CampoTexto:
 
             cursor_x = self.rect.x + 5 + fuente.size(self.texto)[0]
 
-            pygame.draw.line(pantalla, self.color_texto,
+            region.union_ip(pygame.draw.line(pantalla, self.color_texto,
+
+                                             (cursor_x, self.rect.y + 5),
+
+                                             (cursor_x, self.rect.y + self.rect.height - 5), 2))
+
+        return region
+
+
+
+
+
+class RenderizadorRegiones:
+    """Actualiza en la ventana solo las regiones que cambiaron desde el frame anterior"""
+
+    def __init__(self, pantalla, umbral=UMBRAL_REGIONES):
+        self.pantalla = pantalla
+        self.area_limite = umbral * pantalla.get_width() * pantalla.get_height()
+        self.regiones_anteriores = []
+        self.completo = True  # El primer frame se muestra entero
+        self.flips = 0
+        self.actualizaciones = 0
+
+    def borrar(self):
+        """Pinta de negro lo dibujado en el frame anterior en lugar de toda la pantalla"""
+        if self.completo:
+            self.pantalla.fill(NEGRO)
+        else:
+            for rect in self.regiones_anteriores:
+                self.pantalla.fill(NEGRO, rect)
+
+    def presentar(self, regiones):
+        """Lleva a la ventana las regiones dibujadas en este frame y las del anterior
+        (que quedaron borradas); si suman demasiada área hace un flip completo"""
+        regiones = [rect for rect in regiones if rect]
+        sucias = self.regiones_anteriores + regiones
+        if self.completo or sum(rect.width * rect.height for rect in sucias) > self.area_limite:
+            pygame.display.flip()
+            self.flips += 1
+        else:
+            pygame.display.update(sucias)
+            self.actualizaciones += 1
+        self.regiones_anteriores = regiones
+        self.completo = False
+
+    def invalidar(self):
+        """Fuerza que el siguiente frame se redibuje y muestre completo"""
+        self.completo = True
+
+
+
+
+
+class PerfilFrames:
+    """Tiempo de cada fase del frame, con percentiles sobre una ventana de los últimos frames"""
+
+    FASES = ("eventos", "disparos", "actualizacion", "colisiones", "particulas", "dibujo", "flip")
+
+    def __init__(self, ventana=300, max_historial=100000):
+        self.ventana = {fase: deque(maxlen=ventana) for fase in self.FASES}
+        self.historial = deque(maxlen=max_historial)  # Una fila de milisegundos por frame
+        self.frame_actual = dict.fromkeys(self.FASES, 0.0)
+        self.ultima_marca = time.perf_counter()
+        self.mostrar_overlay = True
+        self.frames = 0
+        self.resumen_cacheado = None
+
+    def iniciar_frame(self):
+        self.frame_actual = dict.fromkeys(self.FASES, 0.0)
+        self.ultima_marca = time.perf_counter()
 
-                             (cursor_x, self.rect.y + 5),
+    def marcar(self, fase):
+        """Suma a la fase el tiempo transcurrido desde la marca anterior"""
+        ahora = time.perf_counter()
+        self.frame_actual[fase] += (ahora - self.ultima_marca) * 1000
+        self.ultima_marca = ahora
 
-                             (cursor_x, self.rect.y + self.rect.height - 5), 2)
+    def terminar_frame(self):
+        for fase, milisegundos in self.frame_actual.items():
+            self.ventana[fase].append(milisegundos)
+        self.historial.append(tuple(self.frame_actual.values()))
+        self.frames += 1
+        if self.frames % 30 == 0:
+            self.resumen_cacheado = None
+
+    def resumen(self):
+        """Percentiles p50/p95/p99 en milisegundos de cada fase en la ventana actual"""
+        if self.resumen_cacheado is None:
+            self.resumen_cacheado = {}
+            for fase, muestras in self.ventana.items():
+                ordenadas = sorted(muestras) or [0.0]
+                self.resumen_cacheado[fase] = {
+                    f"p{percentil}": ordenadas[min(len(ordenadas) - 1, len(ordenadas) * percentil // 100)]
+                    for percentil in (50, 95, 99)
+                }
+        return self.resumen_cacheado
+
+    def exportar(self, ruta_base):
+        """Escribe el historial por frame en <ruta_base>.csv y el resumen en <ruta_base>.json"""
+        with open(f"{ruta_base}.csv", "w", newline="", encoding="utf-8") as archivo:
+            escritor = csv.writer(archivo)
+            escritor.writerow(("frame",) + self.FASES)
+            primer_frame = self.frames - len(self.historial)
+            for i, fila in enumerate(self.historial):
+                escritor.writerow((primer_frame + i,) + tuple(f"{valor:.4f}" for valor in fila))
+        self.resumen_cacheado = None
+        with open(f"{ruta_base}.json", "w", encoding="utf-8") as archivo:
+            json.dump({"frames": self.frames, "fases_ms": self.resumen()}, archivo, indent=2)
+
+
+
+
+
+class RelojLogico:
+    """Reloj inyectable para Juego: retorna milisegundos lógicos que avanzan un paso fijo por tick"""
+
+    def __init__(self, paso_ms=1000 / FPS):
+        self.paso_ms = paso_ms
+        self.milisegundos = 0.0
+
+    def __call__(self):
+        return int(self.milisegundos)
+
+    def avanzar(self):
+        self.milisegundos += self.paso_ms
 
 
 
 
 
 class Juego:
-    def __init__(self):
-        self.pantalla = pygame.display.set_mode((ANCHO_VENTANA, ALTO_VENTANA))
-        pygame.display.set_caption("Space Invaders - Palabras con AFD")
-        self.reloj = pygame.time.Clock()
-
-        # Fuentes
-        self.fuente_grande = pygame.font.Font(None, 36)
-        self.fuente_mediana = pygame.font.Font(None, 24)
-        self.fuente_pequeña = pygame.font.Font(None, 18)
-
-        # Crear autómata finito determinista
-        self.automata = AutomataFinitoDeterminista(PALABRAS_JUEGO)
-        
-        # Mostrar información del autómata al iniciar
-        print("¡Autómata creado exitosamente!")
-        print(f"Palabras válidas: {len(PALABRAS_JUEGO)}")
-        print(f"Estados creados: {len(self.automata.estados)}")
-        print(f"Transiciones: {len(self.automata.transiciones)}")
-        print("=" * 50)
+    def __init__(self, ruta_automata=None, sin_pantalla=False, semilla=None, reloj=None, perfilar=False,
+                 mostrar_mensajes=None):
+        """Crea el juego. Con sin_pantalla=True no se abre ventana ni se inicializa pygame y,
+        salvo que se indique otro, se usa un RelojLogico para poder llamar a simular().
+        Con perfilar=True se mide el tiempo de cada fase del frame (F3 muestra u oculta el detalle).
+        Los mensajes de consola (ver informar) se muestran por defecto solo con pantalla"""
+        self.sin_pantalla = sin_pantalla
+        self.perfil = PerfilFrames() if perfilar else None
+        self.mostrar_mensajes = not sin_pantalla if mostrar_mensajes is None else mostrar_mensajes
+        self.aleatorio = random.Random(semilla)
+        if reloj is None:
+            reloj = RelojLogico() if sin_pantalla else pygame.time.get_ticks
+        self.obtener_ticks = reloj
+
+        if not sin_pantalla:
+            # Inicializar Pygame solo al crear el juego, no al importar el módulo
+            pygame.init()
+
+            self.pantalla = pygame.display.set_mode((ANCHO_VENTANA, ALTO_VENTANA))
+            pygame.display.set_caption("Space Invaders - Palabras con AFD")
+            self.renderizador = RenderizadorRegiones(self.pantalla)
+            self.reloj = pygame.time.Clock()
+
+            # Fuentes
+            self.fuente_grande = pygame.font.Font(None, 36)
+            self.fuente_mediana = pygame.font.Font(None, 24)
+            self.fuente_pequeña = pygame.font.Font(None, 18)
+
+        # Crear autómata finito determinista (o cargarlo ya compilado desde un archivo)
+        if ruta_automata:
+            self.automata = AutomataFinitoDeterminista.cargar(ruta_automata, TAMANO_CACHE_AFD)
+            self.informar(f"¡Autómata cargado desde '{ruta_automata}'!")
+            self.informar(f"Palabras válidas: {len(self.automata.vocabulario)}")
+            self.informar(f"Estados: {self.automata.num_estados}")
+            self.informar(f"Transiciones: {self.automata.num_transiciones}")
+        else:
+            self.automata = AutomataFinitoDeterminista(PALABRAS_JUEGO, TAMANO_CACHE_AFD)
+            minimizacion = self.automata.minimizar()
+            
+            # Mostrar información del autómata al iniciar
+            self.informar("¡Autómata creado exitosamente!")
+            self.informar(f"Palabras válidas: {len(PALABRAS_JUEGO)}")
+            self.informar(f"Estados creados: {minimizacion['estados_antes']} -> {minimizacion['estados_despues']} tras minimizar")
+            self.informar(f"Transiciones: {minimizacion['transiciones_antes']} -> {minimizacion['transiciones_despues']} tras minimizar")
+        self.informar("=" * 50)
+        self.palabras_juego = self.automata.vocabulario
 
         # Objetos del juego
         self.nave = Nave(ANCHO_VENTANA // 2 - 30, ALTO_VENTANA - 80)
-        self.campo_texto = CampoTexto(50, ALTO_VENTANA - 40, 300, 30)
+        self.campo_texto = CampoTexto(50, ALTO_VENTANA - 40, 300, 30, self.automata)
         self.palabras_cayendo = []
+        self.pool_palabras = PoolEntidades(PalabraCayendo, CAPACIDAD_PALABRAS, "activa")
         self.puntuacion = 0
+
+        # Índices de las palabras activas: por texto (en orden de aparición) y por posición x
+        self.indice_palabras = {}
+        self.palabras_por_x = []
+        self.hay_palabras_inactivas = False
+        self.pares_probados = 0  # Pares disparo-palabra probados en el último frame
         self.vidas = 3
-        self.tiempo_ultima_palabra = pygame.time.get_ticks()
+        self.tiempo_ultima_palabra = self.obtener_ticks()
 
         # Control de movimiento automático
         self.nave_moviendo = False
         self.objetivo_x = 0
 
         # Efectos visuales
-        self.explosiones = []
+        self.explosiones = SistemaParticulas(CAPACIDAD_PARTICULAS)
         
         # Estadísticas del autómata
         self.palabras_validadas_automata = 0
         self.palabras_rechazadas_automata = 0
+        self.palabras_corregidas_automata = 0
+
 
-        # Inicializar autómata finito determinista
 
-        self.automata_afd = AutomataFinitoDeterminista(PALABRAS_JUEGO)
+    def actualizar_vocabulario(self, agregar=(), eliminar=()):
+        """Agrega y elimina palabras del juego sobre el autómata ya construido"""
+        for palabra in agregar:
+            self.automata.agregar_palabra(palabra)
+        for palabra in eliminar:
+            self.automata.eliminar_palabra(palabra)
+        self.palabras_juego = self.automata.vocabulario
+        self.campo_texto.sincronizar()
 
 
 
     def generar_palabra(self):
 
-        tiempo_actual = pygame.time.get_ticks()
+        tiempo_actual = self.obtener_ticks()
 
-        if tiempo_actual - self.tiempo_ultima_palabra > random.randint(2000, 4000):
+        if tiempo_actual - self.tiempo_ultima_palabra > self.aleatorio.randint(2000, 4000):
 
-            x = random.randint(50, ANCHO_VENTANA - 50)
+            x = self.aleatorio.randint(50, ANCHO_VENTANA - 50)
 
-            palabra = random.choice(PALABRAS_JUEGO)
+            palabra = self.aleatorio.choice(self.palabras_juego)
 
-            nueva_palabra = PalabraCayendo(x, 0, palabra)
+            nueva_palabra = self.pool_palabras.obtener(x, 0, palabra, self.aleatorio)
 
             self.palabras_cayendo.append(nueva_palabra)
 
+            self.registrar_palabra(nueva_palabra)
+
             self.tiempo_ultima_palabra = tiempo_actual
 
 
 
+    def registrar_palabra(self, palabra):
+        """Agrega una palabra que empieza a caer a los índices de palabras activas"""
+        self.indice_palabras.setdefault(palabra.palabra, {})[palabra] = None
+        bisect.insort(self.palabras_por_x, (palabra.x, id(palabra), palabra))
+
+    def desactivar_palabra(self, palabra):
+        """Desactiva una palabra y la quita de los índices de palabras activas"""
+        palabra.activa = False
+        vivas = self.indice_palabras.get(palabra.palabra)
+        if vivas is None or palabra not in vivas:
+            return
+        del vivas[palabra]
+        if not vivas:
+            del self.indice_palabras[palabra.palabra]
+        del self.palabras_por_x[bisect.bisect_left(self.palabras_por_x, (palabra.x, id(palabra)))]
+        self.hay_palabras_inactivas = True
+
     def buscar_palabra_objetivo(self, palabra):
 
         """Busca una palabra en las palabras cayendo y retorna su posición x"""
 
-        for palabra_cayendo in self.palabras_cayendo:
+        vivas = self.indice_palabras.get(palabra.upper())
+
+        if vivas:
 
-            if palabra_cayendo.activa and palabra_cayendo.palabra == palabra.upper():
+            # La primera en aparecer, como en el orden de la lista de palabras
 
-                return palabra_cayendo.x
+            return next(iter(vivas)).x
 
         return None
 
+    def corregir_palabra(self, palabra):
+        """Busca la palabra válida más cercana a una con errores de tipeo, prefiriendo
+        las que están en pantalla. Retorna None si ninguna está a distancia tolerada"""
+        candidatas = self.automata.reconocer_aproximado(palabra, DISTANCIA_TOLERADA)
+        if not candidatas:
+            return None
+        mejor_distancia = candidatas[0][1]
+        for candidata, distancia in candidatas:
+            if distancia == mejor_distancia and self.buscar_palabra_objetivo(candidata) is not None:
+                return candidata
+        return candidatas[0][0]
+
+    def informar(self, mensaje):
+        """Muestra un mensaje del juego en la consola (no en simulaciones sin pantalla)"""
+        if self.mostrar_mensajes:
+            print(mensaje)
+
     def procesar_disparo(self, palabra):
         """Procesa el disparo de una palabra usando el autómata"""
         if not palabra:
             return
 
-        # Verificar la palabra con el autómata
-        es_valida = self.automata.es_palabra_valida(palabra)
-        palabra_reconocida = self.automata.obtener_palabra_reconocida(palabra)
+        # Verificar la palabra con el autómata (un solo recorrido)
+        es_valida, palabra_reconocida = self.automata.procesar_cadena(palabra)
+        corregida = False
+        if not es_valida:
+            # Tolerar errores de tipeo con la palabra más cercana del vocabulario
+            palabra_reconocida = self.corregir_palabra(palabra)
+            es_valida = corregida = palabra_reconocida is not None
         
         if es_valida and palabra_reconocida:
-            self.palabras_validadas_automata += 1
-            print(f"✓ Autómata validó: '{palabra}' -> '{palabra_reconocida}'")
+            if corregida:
+                self.palabras_corregidas_automata += 1
+                self.informar(f"✎ Autómata corrigió: '{palabra}' -> '{palabra_reconocida}'")
+            else:
+                self.palabras_validadas_automata += 1
+                self.informar(f"✓ Autómata validó: '{palabra}' -> '{palabra_reconocida}'")
             
             # Buscar la palabra en las palabras cayendo
             objetivo_x = self.buscar_palabra_objetivo(palabra_reconocida)
@@ -526,16 +958,16 @@ class Juego:
                 # Palabra encontrada, iniciar movimiento hacia ella
                 self.objetivo_x = objetivo_x
                 self.nave_moviendo = True
-                print(f"🎯 Objetivo encontrado en pantalla: {palabra_reconocida}")
+                self.informar(f"🎯 Objetivo encontrado en pantalla: {palabra_reconocida}")
             else:
                 # Palabra válida pero no está en pantalla
                 self.vidas -= 1
-                print(f"❌ Palabra válida '{palabra_reconocida}' no está en pantalla! Vidas: {self.vidas}")
+                self.informar(f"❌ Palabra válida '{palabra_reconocida}' no está en pantalla! Vidas: {self.vidas}")
         else:
             # Palabra no válida según el autómata
             self.palabras_rechazadas_automata += 1
             self.vidas -= 1
-            print(f"❌ Autómata rechazó: '{palabra}' - No es una palabra válida! Vidas: {self.vidas}")
+            self.informar(f"❌ Autómata rechazó: '{palabra}' - No es una palabra válida! Vidas: {self.vidas}")
 
 
 
@@ -559,11 +991,16 @@ class Juego:
 
         """Obtiene la palabra que está en la posición x especificada"""
 
-        for palabra in self.palabras_cayendo:
+        # Las vecinas de x en la lista ordenada son las únicas candidatas a la más cercana
 
-            if palabra.activa and abs(palabra.x - x) < 50:
+        i = bisect.bisect_left(self.palabras_por_x, (x,))
 
-                return palabra.palabra
+        cercana = min(self.palabras_por_x[max(i - 1, 0):i + 1],
+                      key=lambda entrada: abs(entrada[0] - x), default=None)
+
+        if cercana is not None and abs(cercana[0] - x) < 50:
+
+            return cercana[2].palabra
 
         return ""
 
@@ -571,15 +1008,23 @@ class Juego:
 
     def verificar_colisiones(self):
 
-        for disparo in self.nave.disparos[:]:
+        # Un disparo solo puede impactar palabras con su mismo texto, así que solo se
+        # prueban los pares disparo-palabra del mismo grupo del índice de palabras
+        self.pares_probados = 0
+
+        for disparo in self.nave.disparos:
 
-            for palabra in self.palabras_cayendo[:]:
+            candidatas = self.indice_palabras.get(disparo.palabra) if disparo.activo else None
 
-                if (disparo.activo and palabra.activa and
+            if not candidatas:
 
-                        disparo.palabra == palabra.palabra and
+                continue
 
-                        disparo.obtener_rect().colliderect(palabra.obtener_rect())):
+            for palabra in candidatas:
+
+                self.pares_probados += 1
+
+                if disparo.obtener_rect().colliderect(palabra.obtener_rect()):
 
                     # Crear explosión
 
@@ -591,7 +1036,7 @@ class Juego:
 
                     disparo.activo = False
 
-                    palabra.activa = False
+                    self.desactivar_palabra(palabra)
 
 
 
@@ -607,89 +1052,172 @@ class Juego:
 
     def crear_explosion(self, x, y):
 
-        for i in range(10):
-
-            particula = {
-
-                'x': x + random.randint(-20, 20),
-
-                'y': y + random.randint(-20, 20),
-
-                'vel_x': random.uniform(-3, 3),
-
-                'vel_y': random.uniform(-3, 3),
-
-                'vida': 30,
-
-                'color': random.choice([AMARILLO, ROJO, BLANCO])
-
-            }
-
-            self.explosiones.append(particula)
+        self.explosiones.emitir(x, y, generador=self.aleatorio)
 
 
 
     def actualizar_explosiones(self):
 
-        for explosion in self.explosiones[:]:
-
-            explosion['x'] += explosion['vel_x']
-
-            explosion['y'] += explosion['vel_y']
-
-            explosion['vida'] -= 1
-
-            if explosion['vida'] <= 0:
-
-                self.explosiones.remove(explosion)
+        self.explosiones.actualizar()
 
 
 
     def verificar_palabras_perdidas(self):
 
-        for palabra in self.palabras_cayendo[:]:
+        for palabra in self.palabras_cayendo:
 
-            if palabra.y > ALTO_VENTANA - 100:  # Línea de peligro
+            if palabra.activa and palabra.y > ALTO_VENTANA - 100:  # Línea de peligro
 
-                palabra.activa = False
+                self.desactivar_palabra(palabra)
 
                 self.vidas -= 1
 
     def dibujar_ui(self):
+        """Dibuja el HUD y retorna los rectángulos que ocupa"""
+        regiones = []
+
         # Puntuación
-        texto_puntos = self.fuente_mediana.render(f"Puntos: {self.puntuacion}", True, BLANCO)
-        self.pantalla.blit(texto_puntos, (10, 10))
+        texto_puntos = CACHE_TEXTO.renderizar(self.fuente_mediana, f"Puntos: {self.puntuacion}", True, BLANCO)
+        regiones.append(self.pantalla.blit(texto_puntos, (10, 10)))
 
         # Vidas
-        texto_vidas = self.fuente_mediana.render(f"Vidas: {self.vidas}", True, BLANCO)
-        self.pantalla.blit(texto_vidas, (10, 40))
+        texto_vidas = CACHE_TEXTO.renderizar(self.fuente_mediana, f"Vidas: {self.vidas}", True, BLANCO)
+        regiones.append(self.pantalla.blit(texto_vidas, (10, 40)))
         
         # Estadísticas del autómata
-        texto_validadas = self.fuente_pequeña.render(f"AFD Validadas: {self.palabras_validadas_automata}", True, VERDE)
-        self.pantalla.blit(texto_validadas, (10, 70))
+        texto_validadas = CACHE_TEXTO.renderizar(self.fuente_pequeña, f"AFD Validadas: {self.palabras_validadas_automata}", True, VERDE)
+        regiones.append(self.pantalla.blit(texto_validadas, (10, 70)))
         
-        texto_rechazadas = self.fuente_pequeña.render(f"AFD Rechazadas: {self.palabras_rechazadas_automata}", True, ROJO)
-        self.pantalla.blit(texto_rechazadas, (10, 90))
+        texto_rechazadas = CACHE_TEXTO.renderizar(self.fuente_pequeña, f"AFD Rechazadas: {self.palabras_rechazadas_automata}", True, ROJO)
+        regiones.append(self.pantalla.blit(texto_rechazadas, (10, 90)))
+        
+        texto_corregidas = CACHE_TEXTO.renderizar(self.fuente_pequeña, f"AFD Corregidas: {self.palabras_corregidas_automata}", True, AMARILLO)
+        regiones.append(self.pantalla.blit(texto_corregidas, (10, 110)))
 
         # Instrucciones
         if self.nave_moviendo:
-            texto_instruc = self.fuente_pequeña.render("Nave moviéndose hacia objetivo...", True, AMARILLO)
+            texto_instruc = CACHE_TEXTO.renderizar(self.fuente_pequeña, "Nave moviéndose hacia objetivo...", True, AMARILLO)
         else:
-            texto_instruc = self.fuente_pequeña.render("Escribe una palabra válida y presiona ENTER", True, BLANCO)
-        self.pantalla.blit(texto_instruc, (50, ALTO_VENTANA - 70))
+            texto_instruc = CACHE_TEXTO.renderizar(self.fuente_pequeña, "Escribe una palabra válida y presiona ENTER (TAB completa)", True, BLANCO)
+        regiones.append(self.pantalla.blit(texto_instruc, (50, ALTO_VENTANA - 70)))
 
         # Información del autómata
-        texto_automata = self.fuente_pequeña.render(f"AFD: {len(self.automata.estados)} estados, {len(self.automata.transiciones)} transiciones", True, CYAN)
-        self.pantalla.blit(texto_automata, (350, 10))
+        texto_automata = CACHE_TEXTO.renderizar(self.fuente_pequeña, f"AFD: {self.automata.num_estados} estados, {self.automata.num_transiciones} transiciones", True, CYAN)
+        regiones.append(self.pantalla.blit(texto_automata, (350, 10)))
+
+        # Tiempos por fase del frame
+        if self.perfil is not None and self.perfil.mostrar_overlay:
+            for i, (fase, percentiles) in enumerate(self.perfil.resumen().items()):
+                texto_fase = CACHE_TEXTO.renderizar(self.fuente_pequeña, f"{fase}: {percentiles['p50']:.2f} / {percentiles['p95']:.2f} / {percentiles['p99']:.2f} ms", True, CYAN)
+                regiones.append(self.pantalla.blit(texto_fase, (350, 30 + 15 * i)))
 
         # Línea de peligro
-        pygame.draw.line(self.pantalla, ROJO, (0, ALTO_VENTANA - 100), (ANCHO_VENTANA, ALTO_VENTANA - 100), 2)
+        regiones.append(pygame.draw.line(self.pantalla, ROJO, (0, ALTO_VENTANA - 100), (ANCHO_VENTANA, ALTO_VENTANA - 100), 2))
 
         # Texto de línea de peligro
-        texto_peligro = self.fuente_pequeña.render("¡LÍNEA DE PELIGRO!", True, ROJO)
-        self.pantalla.blit(texto_peligro, (ANCHO_VENTANA - 150, ALTO_VENTANA - 120))
+        texto_peligro = CACHE_TEXTO.renderizar(self.fuente_pequeña, "¡LÍNEA DE PELIGRO!", True, ROJO)
+        regiones.append(self.pantalla.blit(texto_peligro, (ANCHO_VENTANA - 150, ALTO_VENTANA - 120)))
 
+        return regiones
 
+    def actualizar(self):
+        """Avanza un paso la lógica del juego: aparición, movimiento, colisiones y partículas"""
+        self.generar_palabra()
+        self.actualizar_movimiento_nave()
+        self.nave.actualizar_disparos()
+
+        # Mover palabras
+        for palabra in self.palabras_cayendo:
+            palabra.mover()
+            if not palabra.activa:
+                self.desactivar_palabra(palabra)
+
+        # Limpiar palabras inactivas (solo si alguna se desactivó) sin crear otra lista
+        if self.hay_palabras_inactivas:
+            self.pool_palabras.compactar(self.palabras_cayendo)
+            self.hay_palabras_inactivas = False
+        if self.perfil is not None:
+            self.perfil.marcar("actualizacion")
+
+        # Verificar colisiones
+        self.verificar_colisiones()
+        self.verificar_palabras_perdidas()
+        if self.perfil is not None:
+            self.perfil.marcar("colisiones")
+
+        self.actualizar_explosiones()
+        if self.perfil is not None:
+            self.perfil.marcar("particulas")
+
+    def dibujar(self):
+        """Dibuja el frame en la pantalla (sin actualizar la ventana) y retorna las regiones dibujadas"""
+        self.renderizador.borrar()
+
+        # Dibujar objetos del juego
+        regiones = [self.nave.dibujar(self.pantalla)]
+
+        for disparo in self.nave.disparos:
+            regiones.append(disparo.dibujar(self.pantalla, self.fuente_pequeña))
+
+        for palabra in self.palabras_cayendo:
+            regiones.append(palabra.dibujar(self.pantalla, self.fuente_mediana))
+
+        # Dibujar explosiones
+        regiones.extend(self.explosiones.dibujar(self.pantalla))
+
+        # Dibujar UI
+        regiones.append(self.campo_texto.dibujar(self.pantalla, self.fuente_mediana))
+        regiones.extend(self.dibujar_ui())
+
+        return regiones
+
+    def mostrar_estadisticas_finales(self):
+        """Muestra en la consola la puntuación y las estadísticas del autómata"""
+        print(f"\n🎮 ¡Juego terminado! Puntuación final: {self.puntuacion}")
+        print("📊 Estadísticas del Autómata:")
+        print(f"   - Palabras validadas: {self.palabras_validadas_automata}")
+        print(f"   - Palabras rechazadas: {self.palabras_rechazadas_automata}")
+        print(f"   - Palabras corregidas: {self.palabras_corregidas_automata}")
+        print(f"   - Estados del AFD: {self.automata.num_estados}")
+        print(f"   - Transiciones del AFD: {self.automata.num_transiciones}")
+        print(f"   - Caché del AFD: {self.automata.aciertos_cache} aciertos, "
+              f"{self.automata.fallos_cache} fallos, {self.automata.desalojos_cache} desalojos")
+
+        if self.perfil is not None:
+            self.perfil.exportar(RUTA_PERFIL)
+            print(f"⏱️ Tiempos por fase del frame (p50 / p95 / p99, {self.perfil.frames} frames):")
+            for fase, percentiles in self.perfil.resumen().items():
+                print(f"   - {fase}: {percentiles['p50']:.2f} / {percentiles['p95']:.2f} / {percentiles['p99']:.2f} ms")
+            print(f"   Detalle exportado en {RUTA_PERFIL}.csv y {RUTA_PERFIL}.json")
+
+    def simular(self, ticks, guion=None, detenerse_al_perder=True):
+        """Ejecuta la lógica del juego sin dibujar ni esperar, avanzando el reloj lógico un paso
+        fijo por tick. guion(juego, tick) retorna las palabras que se escriben en ese tick.
+        Retorna las estadísticas de la simulación, incluidos los ticks por segundo"""
+        if not isinstance(self.obtener_ticks, RelojLogico):
+            raise ValueError("La simulación requiere un Juego creado con un RelojLogico")
+
+        inicio = time.perf_counter()
+        tick = 0
+        while tick < ticks and not (detenerse_al_perder and self.vidas <= 0):
+            if guion is not None:
+                for palabra in guion(self, tick):
+                    self.procesar_disparo(palabra)
+            self.actualizar()
+            self.obtener_ticks.avanzar()
+            tick += 1
+        segundos = time.perf_counter() - inicio
+
+        return {
+            "ticks": tick,
+            "segundos": segundos,
+            "ticks_por_segundo": tick / segundos if segundos > 0 else float("inf"),
+            "puntuacion": self.puntuacion,
+            "vidas": self.vidas,
+            "palabras_validadas": self.palabras_validadas_automata,
+            "palabras_rechazadas": self.palabras_rechazadas_automata,
+            "palabras_corregidas": self.palabras_corregidas_automata,
+        }
 
     def ejecutar(self):
 
@@ -699,62 +1227,61 @@ class Juego:
 
         while ejecutando:
 
+            if self.perfil is not None:
+
+                self.perfil.iniciar_frame()
+
             for evento in pygame.event.get():
 
                 if evento.type == pygame.QUIT:
 
                     ejecutando = False
 
+                if evento.type == pygame.KEYDOWN and evento.key == pygame.K_F3 and self.perfil is not None:
 
+                    self.perfil.mostrar_overlay = not self.perfil.mostrar_overlay
 
-                # Manejar entrada de texto
-
-                palabra_disparada = self.campo_texto.manejar_evento(evento)
+                    continue
 
-                if palabra_disparada:
+                if evento.type in EVENTOS_EXPOSICION:
 
-                    self.procesar_disparo(palabra_disparada)
+                    # La ventana se descubrió o restauró: el siguiente frame se muestra entero
 
+                    self.renderizador.invalidar()
 
+                    continue
 
-            # Actualizar juego
 
-            self.generar_palabra()
-
-            self.actualizar_movimiento_nave()
-
-            self.nave.actualizar_disparos()
 
+                # Manejar entrada de texto
 
+                palabra_disparada = self.campo_texto.manejar_evento(evento)
 
-            # Mover palabras
+                if palabra_disparada:
 
-            for palabra in self.palabras_cayendo:
+                    if self.perfil is not None:
 
-                palabra.mover()
+                        self.perfil.marcar("eventos")
 
+                    self.procesar_disparo(palabra_disparada)
 
+                    if self.perfil is not None:
 
-            # Limpiar palabras inactivas
+                        self.perfil.marcar("disparos")
 
-            self.palabras_cayendo = [p for p in self.palabras_cayendo if p.activa]
+            if self.perfil is not None:
 
+                self.perfil.marcar("eventos")
 
 
-            # Verificar colisiones
 
-            self.verificar_colisiones()
+            # Actualizar juego
 
-            self.verificar_palabras_perdidas()
+            self.actualizar()
 
-            self.actualizar_explosiones()            # Verificar fin del juego
+            # Verificar fin del juego
             if self.vidas <= 0:
-                print(f"\n🎮 ¡Juego terminado! Puntuación final: {self.puntuacion}")
-                print(f"📊 Estadísticas del Autómata:")
-                print(f"   - Palabras validadas: {self.palabras_validadas_automata}")
-                print(f"   - Palabras rechazadas: {self.palabras_rechazadas_automata}")
-                print(f"   - Estados del AFD: {len(self.automata.estados)}")
-                print(f"   - Transiciones del AFD: {len(self.automata.transiciones)}")
+                self.mostrar_estadisticas_finales()
                 
                 # Opción para mostrar el autómata completo
                 respuesta = input("\n¿Deseas ver la estructura completa del autómata? (s/n): ")
@@ -767,55 +1294,49 @@ class Juego:
 
             # Dibujar todo
 
-            self.pantalla.fill(NEGRO)
-
-
-
-            # Dibujar objetos del juego
-
-            self.nave.dibujar(self.pantalla)
-
-
-
-            for disparo in self.nave.disparos:
-
-                disparo.dibujar(self.pantalla, self.fuente_pequeña)
-
+            regiones = self.dibujar()
 
+            if self.perfil is not None:
 
-            for palabra in self.palabras_cayendo:
+                self.perfil.marcar("dibujo")
 
-                palabra.dibujar(self.pantalla, self.fuente_mediana)
 
 
+            # Solo se envían a la ventana las regiones que cambiaron
+            self.renderizador.presentar(regiones)
 
-            # Dibujar explosiones
+            if self.perfil is not None:
 
-            for explosion in self.explosiones:
+                self.perfil.marcar("flip")
 
-                pygame.draw.circle(self.pantalla, explosion['color'],
+                self.perfil.terminar_frame()
 
-                                   (int(explosion['x']), int(explosion['y'])), 3)
-
-
-
-            # Dibujar UI
-
-            self.campo_texto.dibujar(self.pantalla, self.fuente_mediana)
+            self.reloj.tick(FPS)
 
-            self.dibujar_ui()
 
 
+        pygame.quit()
 
-            pygame.display.flip()
+        sys.exit()
 
-            self.reloj.tick(FPS)
 
 
+def guion_desde_eventos(eventos):
+    """Convierte una lista de (tick, palabra) en un guion para Juego.simular"""
+    por_tick = {}
+    for tick, palabra in eventos:
+        por_tick.setdefault(tick, []).append(palabra)
+    return lambda juego, tick: por_tick.get(tick, ())
 
-        pygame.quit()
 
-        sys.exit()
+def guion_jugador_automatico(periodo=30):
+    """Guion para Juego.simular que cada `periodo` ticks escribe la palabra más baja en pantalla"""
+    def guion(juego, tick):
+        if tick % periodo or not juego.palabras_por_x:
+            return ()
+        mas_baja = max((palabra for _, _, palabra in juego.palabras_por_x), key=lambda palabra: palabra.y)
+        return (mas_baja.palabra,)
+    return guion
 
 
 
@@ -824,6 +1345,9 @@ class Juego:
 # Ejecutar el juego
 
 if __name__ == "__main__":
-    juego = Juego()
+    # Opcionalmente, la ruta de un autómata guardado con AutomataFinitoDeterminista.guardar()
+    # y --perfil para medir el tiempo de cada fase del frame
+    rutas = [argumento for argumento in sys.argv[1:] if not argumento.startswith("--")]
+    juego = Juego(rutas[0] if rutas else None, perfilar="--perfil" in sys.argv)
 
     juego.ejecutar()
\ No newline at end of file
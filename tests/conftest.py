@@ -0,0 +1,26 @@
+"""Configuración compartida por las pruebas"""
+
+import os
+
+import sys
+
+import pytest
+
+
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Las pruebas importan los módulos del juego desde la raíz del repositorio
+if RAIZ not in sys.path:
+    sys.path.insert(0, RAIZ)
+
+
+
+@pytest.fixture(params=["numpy", "sin_numpy"])
+def con_numpy(request, monkeypatch):
+    """Corre la prueba con NumPy y con el camino de respaldo en Python puro"""
+    if request.param == "sin_numpy":
+        monkeypatch.setitem(sys.modules, "numpy", None)  # import numpy lanza ImportError
+    else:
+        pytest.importorskip("numpy")
+    return request.param == "numpy"
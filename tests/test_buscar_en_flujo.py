@@ -0,0 +1,44 @@
+"""buscar_en_flujo comparado con una búsqueda exhaustiva, con fragmentos cortados al azar y
+caracteres que se expanden al pasarlos a mayúsculas"""
+
+import random
+
+import pytest
+
+from automata import AutomataFinitoDeterminista
+
+
+
+def buscar_exhaustivo(vocabulario, texto):
+    """(desplazamiento en el texto original, palabra) de cada aparición de cada palabra"""
+    mayusculas = []
+    origenes = []
+    for desplazamiento, caracter in enumerate(texto):
+        for mayuscula in caracter.upper():
+            mayusculas.append(mayuscula)
+            origenes.append(desplazamiento)
+    mayusculas = "".join(mayusculas)
+    return sorted((origenes[inicio], palabra) for palabra in vocabulario
+                  for inicio in range(len(mayusculas)) if mayusculas.startswith(palabra, inicio))
+
+
+def cortar(generador, texto):
+    cortes = sorted(generador.randint(0, len(texto)) for _ in range(generador.randint(0, 6)))
+    return [texto[inicio:fin] for inicio, fin in zip([0] + cortes, cortes + [len(texto)])]
+
+
+def test_caracter_expandido_no_desplaza_lo_siguiente():
+    automata = AutomataFinitoDeterminista(["PYTHON", "NAVE"])
+    assert list(automata.buscar_en_flujo(["straße python nave"])) == [(7, "PYTHON"), (14, "NAVE")]
+    assert list(automata.buscar_en_flujo(["ﬁn ", "python"])) == [(3, "PYTHON")]
+
+
+@pytest.mark.parametrize("semilla", range(30))
+def test_coincide_con_busqueda_exhaustiva(semilla):
+    generador = random.Random(semilla)
+    letras = "abns" + "ßﬁ"  # ß -> SS, ﬁ -> FI
+    vocabulario = sorted({"".join(generador.choice("ABNSFI") for _ in range(generador.randint(1, 4)))
+                          for _ in range(generador.randint(1, 12))} | {"SS", "FIN"})
+    texto = "".join(generador.choice(letras + " ") for _ in range(generador.randint(0, 200)))
+    automata = AutomataFinitoDeterminista(vocabulario)
+    assert sorted(automata.buscar_en_flujo(cortar(generador, texto))) == buscar_exhaustivo(vocabulario, texto)
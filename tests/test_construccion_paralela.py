@@ -0,0 +1,56 @@
+"""construir_en_paralelo: fusionar los fragmentos por huella da el mismo AFD mínimo que
+construir y minimizar en un solo proceso"""
+
+import random
+
+import pytest
+
+from automata import AutomataFinitoDeterminista
+
+
+
+def palabras_aleatorias(generador, cantidad):
+    """Palabras con prefijos y sufijos repetidos, para que haya estados que fusionar entre fragmentos"""
+    prefijos = ["", "A", "AB", "BA", "CAB"]
+    sufijos = ["", "ON", "ADO", "ANDO", "CION"]
+    return [generador.choice(prefijos) + "".join(generador.choice("ABCDN") for _ in range(generador.randint(0, 3)))
+            + generador.choice(sufijos) for _ in range(cantidad)]
+
+
+@pytest.mark.parametrize("semilla", range(12))
+@pytest.mark.parametrize("longitud_prefijo", [1, 2, 3])
+def test_igual_que_construir_y_minimizar(semilla, longitud_prefijo, con_numpy):
+    generador = random.Random(semilla)
+    palabras = palabras_aleatorias(generador, generador.randint(0, 150))
+    if semilla % 2:
+        palabras = [palabra.lower() for palabra in palabras]
+    vocabulario = sorted({palabra.upper() for palabra in palabras if palabra})
+    consultas = vocabulario + [palabra.upper() for palabra in palabras_aleatorias(generador, 100)]
+
+    referencia = AutomataFinitoDeterminista(palabras)
+    arbol = (referencia.num_estados, referencia.num_transiciones)
+    referencia.minimizar()
+    for minimizar, tamanos in ((True, (referencia.num_estados, referencia.num_transiciones)), (False, arbol)):
+        automata = AutomataFinitoDeterminista.construir_en_paralelo(palabras, procesos=1, longitud_prefijo=longitud_prefijo,
+                                                                    minimizar=minimizar)
+        assert (automata.num_estados, automata.num_transiciones) == tamanos
+        assert (automata.es_minimo, automata.es_arbol) == (minimizar, not minimizar)
+        assert list(automata.vocabulario) == vocabulario
+        assert [automata.es_palabra_valida(palabra) for palabra in consultas] == [palabra in vocabulario for palabra in consultas]
+        assert automata.completar("A", 3) == referencia.completar("A", 3)
+
+
+def test_varios_procesos():
+    palabras = palabras_aleatorias(random.Random(0), 2000)
+    referencia = AutomataFinitoDeterminista(palabras)
+    referencia.minimizar()
+    automata = AutomataFinitoDeterminista.construir_en_paralelo(palabras, procesos=2, longitud_prefijo=2)
+    assert (automata.num_estados, automata.num_transiciones) == (referencia.num_estados, referencia.num_transiciones)
+    assert automata.vocabulario == referencia.vocabulario
+    assert automata.agregar_palabra("ZETA") and automata.eliminar_palabra(referencia.vocabulario[0])
+
+
+@pytest.mark.parametrize("longitud_prefijo", [0, -1])
+def test_rechaza_longitud_prefijo_menor_que_1(longitud_prefijo):
+    with pytest.raises(ValueError, match="longitud_prefijo"):
+        AutomataFinitoDeterminista.construir_en_paralelo(["HOLA"], procesos=1, longitud_prefijo=longitud_prefijo)
@@ -0,0 +1,173 @@
+"""agregar_palabra y eliminar_palabra: el AFD sigue siendo mínimo y reconoce el vocabulario
+editado, y completar() coincide con una búsqueda exhaustiva tras cada edición"""
+
+import random
+
+import pytest
+
+from automata import CABECERA_FORMATO, MARCA_ARBOL, AutomataFinitoDeterminista, SIN_TRANSICION
+
+
+
+def palabra_aleatoria(generador, letras="ABCD", longitud_maxima=5):
+    return "".join(generador.choice(letras) for _ in range(generador.randint(1, longitud_maxima)))
+
+
+def alcanzables(automata):
+    """(estados, transiciones) alcanzables desde el inicial; los estados liberados por
+    eliminar_palabra() se reutilizan pero siguen contados en num_estados"""
+    vistos = {automata.estado_inicial}
+    pila = [automata.estado_inicial]
+    transiciones = 0
+    while pila:
+        estado = pila.pop()
+        for caracter in automata.columnas:
+            destino = automata.transicion(estado, caracter)
+            if destino != SIN_TRANSICION:
+                transiciones += 1
+                if destino not in vistos:
+                    vistos.add(destino)
+                    pila.append(destino)
+    return len(vistos), transiciones
+
+
+def completar_exhaustivo(vocabulario, pesos, prefijo, k):
+    candidatas = [palabra for palabra in vocabulario if palabra.startswith(prefijo)]
+    candidatas.sort(key=lambda palabra: (-pesos.get(palabra, len(palabra) * 10), palabra))
+    return candidatas[:k]
+
+
+def comprobar(automata, vocabulario, pesos, generador):
+    assert list(automata.vocabulario) == sorted(vocabulario)
+    assert all(automata.es_palabra_valida(palabra) for palabra in vocabulario)
+    consultas = [palabra_aleatoria(generador, "ABCDE") for _ in range(20)]
+    assert [automata.es_palabra_valida(palabra) for palabra in consultas] == [palabra in vocabulario for palabra in consultas]
+    for prefijo in ("", "A", "AB", "B", "DDD", "X"):
+        k = generador.randint(1, 6)
+        assert automata.completar(prefijo, k) == completar_exhaustivo(vocabulario, pesos, prefijo, k)
+        estado = automata.estado_inicial
+        for caracter in prefijo:
+            estado = automata.transicion(estado, caracter) if estado != SIN_TRANSICION else estado
+        assert automata.completaciones(estado) == sum(palabra.startswith(prefijo) for palabra in vocabulario)
+
+
+@pytest.mark.parametrize("semilla", range(16))
+def test_ediciones_aleatorias(semilla, con_numpy, tmp_path):
+    generador = random.Random(semilla)
+    vocabulario = {palabra_aleatoria(generador) for _ in range(generador.randint(0, 80))}
+    automata = AutomataFinitoDeterminista(vocabulario)
+    if semilla % 3:
+        automata.minimizar()
+    pesos = {}
+    if semilla % 4 == 0:
+        pesos = {palabra: generador.randint(0, 5) for palabra in vocabulario if generador.random() < 0.5}
+        automata.asignar_pesos(pesos)
+    if semilla % 5 == 0:
+        # Las tablas de un autómata cargado son vistas de solo lectura hasta la primera edición
+        ruta = tmp_path / "automata.afd"
+        automata.guardar(ruta)
+        automata = AutomataFinitoDeterminista.cargar(ruta)
+        automata.asignar_pesos(pesos)
+
+    editado = False
+    for _ in range(150):
+        palabra = palabra_aleatoria(generador)
+        if generador.random() < 0.5:
+            cambio = palabra not in vocabulario
+            assert automata.agregar_palabra(palabra) == cambio
+            vocabulario.add(palabra)
+        else:
+            cambio = palabra in vocabulario
+            assert automata.eliminar_palabra(palabra) == cambio
+            vocabulario.discard(palabra)
+        comprobar(automata, vocabulario, pesos, generador)
+
+        # Un árbol sin minimizar se minimiza en la primera edición efectiva
+        editado = editado or cambio
+        if not editado:
+            continue
+        referencia = AutomataFinitoDeterminista(sorted(vocabulario))
+        referencia.minimizar()
+        assert alcanzables(automata) == (referencia.num_estados, referencia.num_transiciones)
+        assert automata.num_transiciones == referencia.num_transiciones
+        assert automata.es_minimo
+
+
+def test_letras_nuevas_amplian_el_alfabeto(con_numpy):
+    automata = AutomataFinitoDeterminista(["HOLA", "HOJA"])
+    automata.minimizar()
+    assert automata.agregar_palabra("ÑANDÚ")
+    assert automata.es_palabra_valida("ñandú")
+    assert automata.completar("Ñ") == ["ÑANDÚ"]
+    assert automata.eliminar_palabra("HOLA")
+    assert automata.vocabulario == ["HOJA", "ÑANDÚ"]
+
+
+@pytest.mark.parametrize("semilla", range(8))
+def test_ampliar_alfabeto_conserva_estados_libres(semilla, con_numpy):
+    """Las palabras con letras nuevas reutilizan los estados que liberaron las eliminaciones"""
+    generador = random.Random(semilla)
+    vocabulario = {palabra_aleatoria(generador) for _ in range(60)}
+    automata = AutomataFinitoDeterminista(vocabulario)
+    automata.minimizar()
+    letras_nuevas = iter("EFGHIJKLMNÑOPQRSTUVWXYZ")
+    for paso in range(40):
+        if paso % 4 == 3:
+            palabra = palabra_aleatoria(generador) + next(letras_nuevas)
+            assert automata.agregar_palabra(palabra)
+            vocabulario.add(palabra)
+        elif vocabulario:
+            palabra = generador.choice(sorted(vocabulario))
+            assert automata.eliminar_palabra(palabra)
+            vocabulario.discard(palabra)
+        comprobar(automata, vocabulario, {}, generador)
+        # Cada estado es alcanzable o está en la lista de libres: ninguna fila se pierde
+        estados, transiciones = alcanzables(automata)
+        assert estados + len(automata._libres) == automata.num_estados
+        referencia = AutomataFinitoDeterminista(sorted(vocabulario))
+        referencia.minimizar()
+        assert (estados, transiciones) == (referencia.num_estados, referencia.num_transiciones)
+
+
+def test_muchas_agregadas_reconstruyen_las_completaciones(con_numpy):
+    """Pasado el umbral de palabras agregadas aparte, las completaciones se rehacen"""
+    generador = random.Random(0)
+    vocabulario = {palabra_aleatoria(generador, "ABCDEF", 7) for _ in range(200)}
+    automata = AutomataFinitoDeterminista(vocabulario)
+    automata.minimizar()
+    automata.completar("A")
+    for indice in range(700):
+        palabra = palabra_aleatoria(generador, "ABCDEF", 7)
+        automata.agregar_palabra(palabra)
+        vocabulario.add(palabra)
+        if indice % 50 == 0:
+            vocabulario.discard(automata.vocabulario[0])
+            automata.eliminar_palabra(automata.vocabulario[0])
+            comprobar(automata, vocabulario, {}, generador)
+    comprobar(automata, vocabulario, {}, generador)
+
+
+def test_archivo_version_1(tmp_path):
+    """Los archivos de la versión 1 no indican si el AFD es mínimo: se minimiza al editar"""
+    automata = AutomataFinitoDeterminista(["HOLA", "HOJA", "MANO"])
+    automata.minimizar()
+    ruta = tmp_path / "v2.afd"
+    automata.guardar(ruta)
+    datos = bytearray(ruta.read_bytes())
+    magia, _, big_endian, marcas, *resto = CABECERA_FORMATO.unpack_from(datos)
+    CABECERA_FORMATO.pack_into(datos, 0, magia, 1, big_endian, marcas & MARCA_ARBOL, *resto)
+    ruta_v1 = tmp_path / "v1.afd"
+    ruta_v1.write_bytes(datos)
+
+    cargado = AutomataFinitoDeterminista.cargar(ruta_v1)
+    assert not cargado.es_minimo
+    assert cargado.agregar_palabra("HORA")
+    assert cargado.es_minimo
+    assert cargado.completar("HO", 5) == ["HOJA", "HOLA", "HORA"]
+
+    cargado = AutomataFinitoDeterminista.cargar(ruta)
+    assert cargado.es_minimo
+    assert cargado.agregar_palabra("HORA")
+    referencia = AutomataFinitoDeterminista(["HOLA", "HOJA", "HORA", "MANO"])
+    referencia.minimizar()
+    assert alcanzables(cargado) == (referencia.num_estados, referencia.num_transiciones)
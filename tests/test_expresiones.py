@@ -0,0 +1,122 @@
+"""AutomataExpresiones comparado con re.fullmatch sobre expresiones y cadenas al azar, con
+una caché de 2 estados para que se vacíe durante el recorrido"""
+
+import random
+
+import re
+
+import pytest
+
+from automata import AutomataExpresiones, AutomataFinitoDeterminista
+
+
+
+LETRAS = "ABC"
+
+ESCAPADOS = ".*|()"
+
+ENTRADA = "ABCD.*|()-]"  # D no aparece en ninguna expresión
+
+
+
+def clase_aleatoria(generador):
+    elementos = []
+    for _ in range(generador.randint(1, 3)):
+        opcion = generador.random()
+        if opcion < 0.4:
+            elementos.append(generador.choice(LETRAS + ".*|("))
+        elif opcion < 0.7:
+            inicio, fin = sorted(generador.sample(LETRAS, 2))
+            elementos.append(f"{inicio}-{fin}")
+        else:
+            elementos.append("\\]")
+    # Un '-' literal al principio o al final de la clase
+    if generador.random() < 0.3:
+        elementos.insert(0 if generador.random() < 0.5 else len(elementos), "-")
+    return "[" + ("^" if generador.random() < 0.3 else "") + "".join(elementos) + "]"
+
+
+def atomo_aleatorio(generador, profundidad):
+    opcion = generador.random()
+    if profundidad <= 0 or opcion < 0.35:
+        return generador.choice(LETRAS)
+    if opcion < 0.45:
+        return "."
+    if opcion < 0.6:
+        return clase_aleatoria(generador)
+    if opcion < 0.7:
+        return "\\" + generador.choice(ESCAPADOS)
+    # Grupo: los cuantificadores quedan anidados al cuantificar un grupo que ya tiene uno
+    return "(" + expresion_aleatoria(generador, profundidad - 1) + ")"
+
+
+def expresion_aleatoria(generador, profundidad=3):
+    """Alternativas de secuencias, que pueden ser vacías (p. ej. 'A|' o '(|B)')"""
+    secuencias = []
+    for _ in range(generador.randint(1, 3)):
+        factores = []
+        for _ in range(generador.randint(0, 3)):
+            factor = atomo_aleatorio(generador, profundidad)
+            if generador.random() < 0.35:
+                factor += generador.choice("*+?")
+            factores.append(factor)
+        secuencias.append("".join(factores))
+    return "|".join(secuencias)
+
+
+def cadenas_aleatorias(generador, cantidad=300):
+    return ["".join(generador.choice(ENTRADA) for _ in range(generador.randint(0, 8))) for _ in range(cantidad)]
+
+
+@pytest.mark.parametrize("semilla", range(60))
+def test_coincide_con_re(semilla):
+    generador = random.Random(semilla)
+    patron = expresion_aleatoria(generador)
+    automata = AutomataExpresiones(patron, max_estados=2)
+    referencia = re.compile(patron)
+    for cadena in cadenas_aleatorias(generador):
+        assert automata.procesar_cadena(cadena)[0] == (referencia.fullmatch(cadena) is not None), (patron, cadena)
+
+
+@pytest.mark.parametrize("semilla", range(20))
+def test_varias_expresiones(semilla):
+    generador = random.Random(1000 + semilla)
+    patrones = [expresion_aleatoria(generador, 2) for _ in range(generador.randint(2, 4))]
+    automata = AutomataExpresiones(patrones, max_estados=2)
+    referencias = [re.compile(patron) for patron in patrones]
+    for cadena in cadenas_aleatorias(generador):
+        esperado = any(referencia.fullmatch(cadena) for referencia in referencias)
+        assert automata.procesar_cadena(cadena)[0] == esperado, (patrones, cadena)
+
+
+def test_la_cache_se_vacia_sin_cambiar_el_resultado():
+    patron = "(A|B)*A" + "(A|B)" * 6
+    generador = random.Random(0)
+    cadenas = ["".join(generador.choice("AB") for _ in range(generador.randint(0, 40))) for _ in range(200)]
+    chica = AutomataExpresiones(patron, max_estados=2)
+    grande = AutomataExpresiones(patron, max_estados=10000)
+    for cadena in cadenas:
+        assert chica.procesar_cadena(cadena)[0] == grande.procesar_cadena(cadena)[0] == bool(re.fullmatch(patron, cadena))
+    assert chica.vaciados_cache > 0
+    assert chica.num_estados <= 2
+    assert grande.vaciados_cache == 0
+
+
+def test_minusculas_y_desde_expresiones():
+    automata = AutomataFinitoDeterminista.desde_expresiones(["VAR(IABLE)?S?", "bucles?"])
+    assert automata.procesar_cadena("variables")[0]
+    assert automata.procesar_cadena(" bucle ")[0]
+    assert not automata.procesar_cadena("varia")[0]
+
+
+@pytest.mark.parametrize("patron", ["(A", "A)", "*A", "A|+", "[A", "[^", "[C-A]", "A\\", "(", "[A-"])
+def test_expresion_invalida(patron):
+    with pytest.raises(ValueError, match="Expresión regular inválida"):
+        AutomataExpresiones(patron)
+
+
+def test_argumentos_invalidos():
+    with pytest.raises(ValueError):
+        AutomataExpresiones([])
+    with pytest.raises(ValueError):
+        AutomataExpresiones("A", max_estados=1)
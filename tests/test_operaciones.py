@@ -0,0 +1,87 @@
+"""Unión, intersección y diferencia por producto perezoso, comparadas con conjuntos de Python
+y con el AFD mínimo construido desde cero"""
+
+import random
+
+import pytest
+
+from automata import AutomataFinitoDeterminista
+
+
+
+OPERACIONES = {
+    "union": lambda a, b: a | b,
+    "interseccion": lambda a, b: a & b,
+    "diferencia": lambda a, b: a - b,
+}
+
+
+
+def palabras_aleatorias(generador, cantidad, letras, longitud_maxima=6):
+    return {"".join(generador.choice(letras) for _ in range(generador.randint(1, longitud_maxima)))
+            for _ in range(cantidad)}
+
+
+def minimo_desde_cero(palabras):
+    automata = AutomataFinitoDeterminista(sorted(palabras))
+    automata.minimizar()
+    return automata
+
+
+@pytest.mark.parametrize("semilla", range(20))
+@pytest.mark.parametrize("operacion", sorted(OPERACIONES))
+def test_producto_coincide_con_conjuntos(semilla, operacion, con_numpy, tmp_path):
+    generador = random.Random(semilla)
+    # Alfabetos que se solapan solo en parte, para cubrir letras que falten en un operando
+    palabras_a = palabras_aleatorias(generador, generador.randint(0, 200), "ABCD" + generador.choice(["", "E", "ÑZ"]))
+    palabras_b = palabras_aleatorias(generador, generador.randint(0, 200), "ABC" + generador.choice(["", "D", "XY"]))
+    if generador.random() < 0.5:
+        palabras_b |= set(generador.sample(sorted(palabras_a), min(len(palabras_a), 40)))
+    esperadas = OPERACIONES[operacion](palabras_a, palabras_b)
+
+    a = AutomataFinitoDeterminista(palabras_a)
+    b = AutomataFinitoDeterminista(palabras_b)
+    if semilla % 2:
+        a.minimizar()
+    if semilla % 3 == 0:
+        b.minimizar()
+    if semilla % 4 == 0:
+        # Un operando cargado desde archivo trabaja sobre vistas de solo lectura
+        ruta = tmp_path / "a.afd"
+        a.guardar(ruta)
+        a = AutomataFinitoDeterminista.cargar(ruta)
+
+    consultas = sorted(esperadas | palabras_aleatorias(generador, 200, "ABCDEXYZÑ"))
+    for minimizar in (False, True):
+        resultado = getattr(a, operacion)(b, minimizar=minimizar)
+
+        assert resultado.vocabulario == sorted(esperadas)
+        assert [resultado.es_palabra_valida(palabra) for palabra in consultas] == [palabra in esperadas for palabra in consultas]
+        assert [resultado.indice_palabra(palabra) for palabra in resultado.vocabulario] == list(range(len(esperadas)))
+        aceptadas, _ = resultado.procesar_lote(consultas)
+        assert list(aceptadas) == [palabra in esperadas for palabra in consultas]
+        assert resultado.es_minimo == minimizar
+
+        if minimizar:
+            referencia = minimo_desde_cero(esperadas)
+            assert (resultado.num_estados, resultado.num_transiciones) == (referencia.num_estados, referencia.num_transiciones)
+
+
+def test_producto_no_modifica_operandos():
+    a = AutomataFinitoDeterminista(["HOLA", "HOJA", "MANO"])
+    b = AutomataFinitoDeterminista(["HOJA", "PIE"])
+    estados_a, estados_b = a.num_estados, b.num_estados
+    a.union(b, minimizar=True)
+    a.diferencia(b)
+    assert (a.vocabulario, a.num_estados) == (["HOJA", "HOLA", "MANO"], estados_a)
+    assert (b.vocabulario, b.num_estados) == (["HOJA", "PIE"], estados_b)
+
+
+def test_resultado_admite_ediciones():
+    a = AutomataFinitoDeterminista(["HOLA", "HOJA", "MANO"])
+    b = AutomataFinitoDeterminista(["HOJA"])
+    resultado = a.diferencia(b, minimizar=True)
+    assert resultado.agregar_palabra("HORA")
+    assert resultado.eliminar_palabra("MANO")
+    assert resultado.vocabulario == ["HOLA", "HORA"]
+    assert resultado.completar("HO", 5) == ["HOLA", "HORA"]
@@ -0,0 +1,88 @@
+"""Validación masiva: valida con el autómata las palabras de archivos (o de la entrada
+estándar), una por línea, repartidas entre varios procesos. Escribe cada palabra con su
+resultado en el orden de entrada y, en stderr, las estadísticas. No importa pygame.
+
+Uso: python validar.py [archivos ...] [--automata ruta] [--procesos N] [--bloque BYTES] [--solo-resumen]
+"""
+
+import argparse
+
+import os
+
+import sys
+
+import tempfile
+
+import time
+
+from automata import (AutomataFinitoDeterminista, PALABRAS_JUEGO, TAMANO_BLOQUE_VALIDACION, leer_bloques,
+                      validar_en_paralelo)
+
+
+
+def validar_palabras(argumentos=None):
+    """Lee las opciones de la línea de comandos y valida las palabras de los archivos indicados"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("archivos", nargs="*", default=["-"], help="archivos de palabras ('-' es la entrada estándar)")
+    parser.add_argument("--automata", help="autómata guardado con AutomataFinitoDeterminista.guardar() "
+                                           "(por defecto, el de las palabras del juego)")
+    parser.add_argument("--procesos", type=int, default=None, help="procesos (por defecto, uno por núcleo)")
+    parser.add_argument("--bloque", type=int, default=TAMANO_BLOQUE_VALIDACION, help="bytes de entrada por bloque")
+    parser.add_argument("--solo-resumen", action="store_true", help="escribir solo las estadísticas")
+    opciones = parser.parse_args(argumentos)
+
+    # Comprobar las entradas antes de empezar, para no fallar con parte de la salida escrita
+    for nombre in opciones.archivos:
+        if nombre != "-":
+            try:
+                with open(nombre, "rb"):
+                    pass
+            except OSError as error:
+                parser.error(f"no se pudo leer el archivo de palabras: {error}")
+
+    with tempfile.TemporaryDirectory() as directorio:
+        # Los procesos cargan el autómata mapeando el mismo archivo
+        ruta = opciones.automata
+        if ruta is None:
+            ruta = os.path.join(directorio, "palabras_juego.afd")
+            automata = AutomataFinitoDeterminista(PALABRAS_JUEGO)
+            automata.minimizar()
+            automata.guardar(ruta)
+
+        def bloques():
+            for nombre in opciones.archivos:
+                if nombre == "-":
+                    yield from leer_bloques(sys.stdin.buffer, opciones.bloque)
+                else:
+                    with open(nombre, "rb") as archivo:
+                        yield from leer_bloques(archivo, opciones.bloque)
+
+        inicio = time.perf_counter()
+        palabras_validadas = palabras_rechazadas = 0
+        try:
+            resultados = validar_en_paralelo(ruta, bloques(), opciones.procesos, not opciones.solo_resumen)
+        except (OSError, ValueError) as error:
+            parser.error(f"no se pudo cargar el autómata: {error}")
+        try:
+            for salida, validadas, rechazadas in resultados:
+                sys.stdout.buffer.write(salida)
+                palabras_validadas += validadas
+                palabras_rechazadas += rechazadas
+        except OSError as error:
+            # Un archivo que dejó de poder leerse después de la comprobación inicial
+            sys.stdout.flush()
+            parser.error(f"no se pudo leer el archivo de palabras: {error}")
+        sys.stdout.flush()
+        segundos = time.perf_counter() - inicio
+
+    # Las estadísticas van a stderr para no mezclarse con los resultados
+    total = palabras_validadas + palabras_rechazadas
+    print("📊 Estadísticas del Autómata:", file=sys.stderr)
+    print(f"   - Palabras validadas: {palabras_validadas}", file=sys.stderr)
+    print(f"   - Palabras rechazadas: {palabras_rechazadas}", file=sys.stderr)
+    print(f"   - {total} palabras en {segundos:.2f} s "
+          f"({total / segundos if segundos > 0 else float('inf'):.0f} palabras/s)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    validar_palabras()